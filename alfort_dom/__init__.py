@@ -7,10 +7,12 @@ except PackageNotFoundError:
 
 from . import event
 from .app import AlfortDom
+from .decode import decode
+from .lazy import lazy
 from .local_storage import LocalStorage
 from .location import Location
 
 local_storage = LocalStorage()
 location = Location()
 
-__all__ = ["AlfortDom", "local_storage", "location", "event"]
+__all__ = ["AlfortDom", "decode", "lazy", "local_storage", "location", "event"]
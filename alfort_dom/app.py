@@ -1,6 +1,9 @@
-from typing import Any, Callable, Generic, TypeVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Generic, Hashable, Protocol, TypeVar, cast
 
-from alfort import Alfort, Dispatch, Enqueue, Init, Update, View
+from alfort import Alfort, Dispatch, Effect, Enqueue, Init, Update, View
+from alfort.app import NodeDom, NodeDomElement, NodeDomText
 from alfort.sub import Subscriptions
 from alfort.vdom import (
     Node,
@@ -10,105 +13,334 @@ from alfort.vdom import (
     PatchRemoveChild,
     PatchText,
     Props,
+    VDom,
+    VDomElement,
 )
-from js import HTMLElement, document, window
-from pyodide import JsProxy, create_proxy, to_js
+
+from .backend import Element
+from .backend import Node as BackendNode
+from .backend import get_backend
+from .batch import PatchBuffer
+from .css import to_css_text
+from .delegate import NODE_ID_ATTRIBUTE, EventDelegator
+from .event import Limiter, handle_event
+from .keyed import KEY_PROP, has_keys, keys_of, longest_increasing_subsequence
+from .lazy import LAZY_TAG, Lazy, LazyNodeDom, force
+from .profile import Profiler
+from .props import properties
+from .proxy import create_proxy, destroy_proxy
+from .scheduler import FrameScheduler
+from .ssr import attribute_name, render_to_string
+from .template import TemplateCache, is_static
+
+ELEMENT_NODE = 1
+TEXT_NODE = 3
+
+# Style changes of at least this many properties are sent as one cssText.
+STYLE_BULK_THRESHOLD = 3
 
 S = TypeVar("S")
 M = TypeVar("M")
 
 
-def _default_enqueue(render: Callable[[], None]) -> None:
-    def _render(_: Any) -> None:
-        render()
+class DomOps(Protocol):
+    def insert_before(
+        self, parent: BackendNode, child: BackendNode, reference: BackendNode | None
+    ) -> None:
+        ...
+
+    def remove_child(self, parent: BackendNode, child: BackendNode) -> None:
+        ...
+
+    def set_attribute(self, dom: Element, name: str, value: Any) -> None:
+        ...
+
+    def remove_attribute(self, dom: Element, name: str) -> None:
+        ...
+
+    def set_property(self, dom: Element, name: str, value: Any) -> None:
+        ...
+
+    def set_style(self, dom: Element, name: str, value: Any) -> None:
+        ...
+
+    def set_text(self, dom: BackendNode, text: str) -> None:
+        ...
+
+
+class _DirectOps:
+    def insert_before(
+        self, parent: BackendNode, child: BackendNode, reference: BackendNode | None
+    ) -> None:
+        parent.insertBefore(child, reference)
+
+    def remove_child(self, parent: BackendNode, child: BackendNode) -> None:
+        parent.removeChild(child)
+
+    def set_attribute(self, dom: Element, name: str, value: Any) -> None:
+        dom.setAttribute(name, value)
+
+    def remove_attribute(self, dom: Element, name: str) -> None:
+        dom.removeAttribute(name)
+
+    def set_property(self, dom: Element, name: str, value: Any) -> None:
+        setattr(dom, name, value)
+
+    def set_style(self, dom: Element, name: str, value: Any) -> None:
+        setattr(dom.style, name, value)
+
+    def set_text(self, dom: BackendNode, text: str) -> None:
+        dom.nodeValue = text
+
+
+_direct_ops = _DirectOps()
 
-    window.requestAnimationFrame(create_proxy(_render))
+
+@dataclass
+class ListenerStats:
+    """DOM listener operations made, and skipped by swapping handlers in place."""
+
+    added: int = 0
+    removed: int = 0
+    skipped: int = 0
+
+
+listener_stats = ListenerStats()
+
+
+def _normalize_style(style: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in style.items() if v is not None and v != ""}
 
 
 class DomNode(Node, Generic[M]):
-    dom: HTMLElement
+    dom: BackendNode
+    tag: str | None
     dispatch: Dispatch[M]
     handlers: dict[str, Callable[[Any], M]]
-    listener: JsProxy
+    listener: Any | None
+    ops: DomOps
+    delegator: EventDelegator | None
+    node_id: str | None
+    children: dict["DomNode[M]", None]
+    style: dict[str, Any] | None
+    profiler: Profiler | None
 
-    def __init__(self, dom: HTMLElement, dispatch: Dispatch[M] | None = None) -> None:
+    def __init__(
+        self,
+        dom: BackendNode,
+        dispatch: Dispatch[M] | None = None,
+        ops: DomOps | None = None,
+        delegator: EventDelegator | None = None,
+        profiler: Profiler | None = None,
+        tag: str | None = None,
+    ) -> None:
         self.dom = dom
+        self.tag = tag
         self.dispatch = dispatch if dispatch is not None else lambda _: None
         self.handlers = {}
+        self.listener = None
+        self.ops = ops if ops is not None else _direct_ops
+        self.delegator = delegator
+        self.node_id = None
+        self.children = {}
+        self.style = {}
+        self.profiler = profiler
+
+    def handle(self, event: Any) -> None:
+        if handler := self.handlers.get(event.type):
+            handle_event(handler, event, self.dispatch)
+
+    def release(self) -> None:
+        """Release the listener proxy and handlers of this node and its subtree."""
+        for child in self.children:
+            child.release()
+        self.children.clear()
+        self.handlers.clear()
+        if self.listener is not None:
+            destroy_proxy(self.listener)
+            self.listener = None
+        if self.delegator is not None and self.node_id is not None:
+            self.delegator.unregister(self.node_id)
+            self.node_id = None
 
-        def _listener(event: Any) -> None:
-            if handler := self.handlers.get(event.type):
-                self.dispatch(handler(event))
+    def _add_handler(self, event_type: str, handler: Callable[[Any], M]) -> None:
+        old = self.handlers.get(event_type)
+        if isinstance(handler, Limiter) and isinstance(old, Limiter):
+            handler.adopt(cast(Limiter[Any], old))
 
-        self.listener = create_proxy(_listener)
+        if self.delegator is not None:
+            if self.node_id is None:
+                self.node_id = self.delegator.register(self)
+                self.ops.set_attribute(
+                    cast(Element, self.dom), NODE_ID_ATTRIBUTE, self.node_id
+                )
+            self.delegator.listen(event_type, handler)
+            self.handlers[event_type] = handler
+            return
+
+        if event_type in self.handlers:
+            # the listener looks handlers up by event type, so a swap is enough
+            self.handlers[event_type] = handler
+            listener_stats.skipped += 2
+            return
+        if self.listener is None:
+            self.listener = create_proxy(self.handle)
+        self.handlers[event_type] = handler
+        self.dom.addEventListener(event_type, self.listener)
+        listener_stats.added += 1
+
+    def _remove_handler(self, event_type: str) -> None:
+        if self.handlers.pop(event_type, None) is None:
+            return
+        if self.delegator is None:
+            self.dom.removeEventListener(event_type, self.listener)
+            listener_stats.removed += 1
+
+    def _set_style(self, style: dict[str, Any]) -> None:
+        dom = cast(Element, self.dom)
+        new_style = _normalize_style(style)
+        if self.style is None:
+            changes = None
+        else:
+            changes = {k: "" for k in self.style if k not in new_style}
+            changes.update(
+                (k, v) for k, v in new_style.items() if self.style.get(k) != v
+            )
+
+        if changes is None or len(changes) >= STYLE_BULK_THRESHOLD:
+            self.ops.set_style(dom, "cssText", to_css_text(new_style))
+        else:
+            for k, v in changes.items():
+                self.ops.set_style(dom, k, v)
+        self.style = new_style
+
+    def count_nodes(self) -> int:
+        return 1 + sum(c.count_nodes() for c in self.children)
 
     def apply(self, patch: Patch) -> None:
+        if self.profiler is None:
+            self._apply(patch)
+            return
+
+        if isinstance(patch, PatchRemoveChild) and isinstance(
+            child := patch.child, DomNode
+        ):
+            self.profiler.record_removed(cast(DomNode[M], child).count_nodes())
+        start = perf_counter()
+        self._apply(patch)
+        self.profiler.record_patch(patch, perf_counter() - start)
+
+    def _apply(self, patch: Patch) -> None:
         match patch:
             case PatchInsertChild(child, None) if isinstance(child, DomNode):
-                self.dom.insertBefore(child.dom, to_js(None))
+                self.ops.insert_before(self.dom, child.dom, None)
+                self.children[child] = None
             case PatchInsertChild(child, reference) if isinstance(
                 child, DomNode
             ) and isinstance(reference, DomNode):
-                self.dom.insertBefore(child.dom, reference.dom)
+                self.ops.insert_before(self.dom, child.dom, reference.dom)
+                self.children[child] = None
             case PatchRemoveChild(child) if isinstance(child, DomNode):
-                self.dom.removeChild(child.dom)
+                self.ops.remove_child(self.dom, child.dom)
+                self.children.pop(cast(DomNode[M], child), None)
+                child.release()
             case PatchProps(remove_keys, add_props):
-                if isinstance(add_props.get("style"), dict):
-                    style = add_props.pop("style")
-                    for k, v in style.items():
-                        setattr(self.dom.style, k, v)
-
+                # props are only patched on the nodes of elements
+                dom = cast(Element, self.dom)
                 for k in remove_keys:
+                    if k == KEY_PROP:
+                        continue
                     if k.startswith("on"):
-                        event_type = k[2:].lower()
-                        self.dom.removeEventListener(event_type, self.listener)
-                        del self.handlers[event_type]
+                        self._remove_handler(k[2:].lower())
                     else:
-                        self.dom.removeAttribute(k)
+                        self.ops.remove_attribute(dom, k)
+                        if k == "style":
+                            self.style = {}
 
                 for k, v in add_props.items():
+                    if k == KEY_PROP:
+                        continue
                     if k.startswith("on"):
                         event_type = k[2:].lower()
-                        if v is not None:
-                            if event_type in self.handlers:
-                                self.dom.removeEventListener(event_type, self.listener)
-                                del self.handlers[event_type]
-                            if callable(v):
-                                self.handlers[event_type] = v
-                            else:
-                                _v = v
-                                self.handlers[event_type] = lambda _: _v
-                            self.dom.addEventListener(event_type, self.listener)
+                        if v is None:
+                            self._remove_handler(event_type)
+                        elif callable(v):
+                            self._add_handler(event_type, cast(Callable[[Any], M], v))
                         else:
-                            self.dom.removeEventListener(event_type, self.listener)
-                            del self.handlers[event_type]
-                    elif hasattr(self.dom, k):
-                        setattr(self.dom, k, v)
+                            _v = v
+                            self._add_handler(event_type, lambda _: _v)
+                    elif k == "style" and isinstance(v, dict):
+                        self._set_style(cast(dict[str, Any], v))
+                    elif properties.is_property(self.tag, k, dom):
+                        self.ops.set_property(dom, k, v)
+                        if k == "style":
+                            self.style = None
                     else:
-                        self.dom.setAttribute(k, v)
+                        self.ops.set_attribute(dom, k, v)
             case PatchText():
-                self.dom.nodeValue = patch.value
+                self.ops.set_text(self.dom, patch.value)
             case _:
                 raise ValueError(f"Unknown patch: {patch}")
 
 
+class _DetachedRoot(Node):
+    """Root of an app rendering nowhere, which `Alfort._main` defaults to."""
+
+    def apply(self, patch: Patch) -> None:
+        pass
+
+
 class AlfortDom(Alfort[S, M, DomNode[M]]):
+    _buffer: PatchBuffer | None
+    _delegator: EventDelegator | None
+    _templates: TemplateCache | None
+    profiler: Profiler | None
+
     def __init__(
         self,
         init: Init[S, M],
         view: View[S],
         update: Update[M, S],
-        enqueue: Enqueue = _default_enqueue,
+        enqueue: Enqueue | None = None,
         subscriptions: Subscriptions[S, M] | None = None,
+        batched: bool = False,
+        delegated: bool = False,
+        templates: bool = False,
+        profiler: Profiler | None = None,
     ) -> None:
+        if enqueue is None:
+            enqueue = FrameScheduler()
         super().__init__(init, view, update, enqueue, subscriptions)
+        self._buffer = PatchBuffer() if batched else None
+        self._delegator = EventDelegator() if delegated else None
+        self._templates = TemplateCache() if templates else None
+        self.profiler = profiler
+
+    @property
+    def scheduler(self) -> FrameScheduler | None:
+        if isinstance(self._enqueue, FrameScheduler):
+            return self._enqueue
+        return None
+
+    def _new_node(
+        self, dom: BackendNode, dispatch: Dispatch[M], tag: str | None = None
+    ) -> DomNode[M]:
+        return DomNode(dom, dispatch, self._buffer, self._delegator, self.profiler, tag)
 
     def create_text(
         self,
         text: str,
         dispatch: Dispatch[M],
     ) -> DomNode[M]:
-        return DomNode(document.createTextNode(text), dispatch)
+        if self.profiler is not None:
+            self.profiler.record_created()
+        return self._new_node(self._create_text_dom(text), dispatch)
+
+    def _create_element_dom(self, tag: str) -> Element:
+        return get_backend().document.createElement(tag)
+
+    def _create_text_dom(self, text: str) -> BackendNode:
+        return get_backend().document.createTextNode(text)
 
     def create_element(
         self,
@@ -117,7 +349,9 @@ class AlfortDom(Alfort[S, M, DomNode[M]]):
         children: list[DomNode[M]],
         dispatch: Dispatch[M],
     ) -> DomNode[M]:
-        dom_node = DomNode(document.createElement(tag, to_js({})), dispatch)
+        if self.profiler is not None:
+            self.profiler.record_created()
+        dom_node = self._new_node(self._create_element_dom(tag), dispatch, tag)
 
         for c in children:
             dom_node.apply(PatchInsertChild(c, None))
@@ -125,8 +359,300 @@ class AlfortDom(Alfort[S, M, DomNode[M]]):
         dom_node.apply(PatchProps(remove_keys=[], add_props=props))
         return dom_node
 
+    def _build_template(self, vdom: VDom) -> BackendNode:
+        vdom = force(vdom)
+        if isinstance(vdom, str):
+            return get_backend().document.createTextNode(vdom)
+        node = DomNode[M](get_backend().document.createElement(vdom.tag), tag=vdom.tag)
+        static = {k: v for k, v in vdom.props.items() if is_static(k, v)}
+        node.apply(PatchProps(remove_keys=[], add_props=static))
+        for c in vdom.children:
+            node.dom.insertBefore(self._build_template(c), None)
+        return node.dom
+
+    def _instantiate(
+        self,
+        parent: DomNode[M] | None,
+        dom: BackendNode,
+        proto: VDom,
+        vdom: VDom,
+        dispatch: Dispatch[M],
+    ) -> NodeDom:
+        if isinstance(vdom, Lazy):
+            inner = self._instantiate(parent, dom, force(proto), vdom.vdom, dispatch)
+            return LazyNodeDom(LAZY_TAG, vdom.props, [inner], inner.node, vdom)
+        proto = force(proto)
+        tag = vdom.tag if isinstance(vdom, VDomElement) else None
+        node = self._new_node(dom, dispatch, tag)
+        if parent is not None:
+            parent.children[node] = None
+        match (proto, vdom):
+            case (str(), str()):
+                if proto != vdom:
+                    node.apply(PatchText(vdom))
+                return NodeDomText(vdom, node)
+            case (VDomElement(), VDomElement(tag, props, children)):
+                if isinstance(style := proto.props.get("style"), dict):
+                    node.style = _normalize_style(cast(dict[str, Any], style))
+                dynamic = {
+                    k: v
+                    for k, v in props.items()
+                    if not is_static(k, v) or proto.props[k] != v
+                }
+                if dynamic:
+                    node.apply(PatchProps(remove_keys=[], add_props=dynamic))
+                new_children = [
+                    self._instantiate(node, d, p, c, dispatch)
+                    for d, p, c in zip(dom.childNodes, proto.children, children)
+                ]
+                return NodeDomElement(tag, props, new_children, node)
+            case _:
+                raise AssertionError(f"unexpected: {proto} {vdom}")
+
+    def patch(
+        self,
+        dispatch: Dispatch[M],
+        node_dom: NodeDom | None,
+        new_vdom: VDom | None,
+    ) -> tuple[NodeDom | None, list[Patch]]:
+        if isinstance(node_dom, LazyNodeDom):
+            if isinstance(new_vdom, Lazy) and new_vdom.same_as(node_dom.lazy):
+                return (node_dom, [])
+            node_dom = node_dom.children[0]
+        if isinstance(new_vdom, Lazy):
+            (inner, patches) = self.patch(dispatch, node_dom, new_vdom.vdom)
+            if inner is None:
+                return (None, patches)
+            lazy_node_dom = LazyNodeDom(
+                LAZY_TAG, new_vdom.props, [inner], inner.node, new_vdom
+            )
+            return (lazy_node_dom, patches)
+
+        if (
+            self._templates is None
+            or not isinstance(new_vdom, VDomElement)
+            or (isinstance(node_dom, NodeDomElement) and node_dom.tag == new_vdom.tag)
+        ):
+            return super().patch(dispatch, node_dom, new_vdom)
+
+        template = self._templates.get(new_vdom, self._build_template)
+        if template is None:
+            return super().patch(dispatch, node_dom, new_vdom)
+
+        new_node_dom = self._instantiate(
+            None, template.dom.cloneNode(True), template.vdom, new_vdom, dispatch
+        )
+        new_node = cast(DomNode[M], new_node_dom.node)
+        if self.profiler is not None:
+            self.profiler.record_created(new_node.count_nodes())
+        cur_node = node_dom.node if node_dom is not None else None
+        return (new_node_dom, self._diff_node(cur_node, new_node))
+
+    def _patch_children(
+        self,
+        dispatch: Dispatch[M],
+        node_children: list[NodeDom],
+        vdom_children: list[VDom],
+    ) -> tuple[list[NodeDom], list[Patch]]:
+        if not has_keys(vdom_children):
+            return super()._patch_children(dispatch, node_children, vdom_children)
+
+        old_keys = keys_of(node_children)
+        new_keys = keys_of(vdom_children)
+        if old_keys == new_keys:
+            return super()._patch_children(dispatch, node_children, vdom_children)
+
+        # Remove the children whose key is gone, patch the others in place.
+        # Children sharing a key are matched in order.
+        old_index: dict[Hashable, list[int]] = {}
+        for i in reversed(range(len(old_keys))):
+            old_index.setdefault(old_keys[i], []).append(i)
+        sources = [
+            positions.pop() if (positions := old_index.get(k)) else -1 for k in new_keys
+        ]
+        patches_to_parent: list[Patch] = [
+            PatchRemoveChild(child=node_children[i].node)
+            for positions in old_index.values()
+            for i in positions
+        ]
+        new_children: list[NodeDom] = []
+        for vdom, source in zip(vdom_children, sources):
+            old = node_children[source] if source >= 0 else None
+            (new_child, patches) = self.patch(dispatch, old, vdom)
+            assert new_child is not None
+            if old is not None:
+                patches_to_parent.extend(patches)
+            new_children.append(new_child)
+
+        # Insert the new children and move the ones off the longest run which
+        # kept its order, from the last child back so references are in place.
+        stay = longest_increasing_subsequence(sources)
+        reference: Any = None
+        for i in reversed(range(len(new_children))):
+            node = new_children[i].node
+            if i not in stay:
+                patches_to_parent.append(PatchInsertChild(node, reference))
+            reference = node
+        return (new_children, patches_to_parent)
+
+    def _run_update(self, msg: M, state: S) -> tuple[S, list[Effect[M]]]:
+        if self.profiler is None:
+            return self._update(msg, state)
+        start = perf_counter()
+        result = self._update(msg, state)
+        self.profiler.record_update(perf_counter() - start)
+        return result
+
+    def _run_view(self, state: S) -> VDom:
+        if self.profiler is None:
+            return self._view(state)
+        start = perf_counter()
+        vdom = self._view(state)
+        self.profiler.record_view(perf_counter() - start)
+        return vdom
+
+    def _flush(self) -> None:
+        if self._buffer is None:
+            return
+        if self.profiler is None:
+            self._buffer.flush()
+            return
+        start = perf_counter()
+        self._buffer.flush()
+        self.profiler.record_flush(perf_counter() - start)
+
+    def _adopt(
+        self, parent: DomNode[M], dom: BackendNode, vdom: VDom, dispatch: Dispatch[M]
+    ) -> NodeDom | None:
+        match vdom:
+            case Lazy():
+                inner = self._adopt(parent, dom, vdom.vdom, dispatch)
+                if inner is None:
+                    return None
+                return LazyNodeDom(LAZY_TAG, vdom.props, [inner], inner.node, vdom)
+            case str() if dom.nodeType == TEXT_NODE:
+                node = self._new_node(dom, dispatch)
+                parent.children[node] = None
+                if dom.nodeValue != vdom:
+                    node.apply(PatchText(vdom))
+                return NodeDomText(vdom, node)
+            case VDomElement(tag, props, children) if (
+                dom.nodeType == ELEMENT_NODE
+                and cast(Element, dom).localName == tag.lower()
+            ):
+                element = cast(Element, dom)
+                node = self._new_node(dom, dispatch, tag)
+                parent.children[node] = None
+                # The markup may be rendered from another state than the one
+                # on the client, so drop the attributes which the view does
+                # not set and apply all of its props, replacing the style.
+                names = {attribute_name(k).lower() for k in props}
+                for name in list(element.getAttributeNames()):
+                    if name.lower() not in names:
+                        node.ops.remove_attribute(element, name)
+                node.style = None
+                node.apply(PatchProps(remove_keys=[], add_props=props))
+                return NodeDomElement(
+                    tag, props, self._hydrate_children(node, children, dispatch), node
+                )
+            case _:
+                return None
+
+    def _hydrate_children(
+        self, parent: DomNode[M], vdoms: list[VDom], dispatch: Dispatch[M]
+    ) -> list[NodeDom]:
+        doms = [
+            d for d in parent.dom.childNodes if d.nodeType in (ELEMENT_NODE, TEXT_NODE)
+        ]
+        children: list[NodeDom] = []
+        for vdom in vdoms:
+            if isinstance(force(vdom), VDomElement):
+                # Skip the whitespace a template may put between elements.
+                while doms and doms[0].nodeType == TEXT_NODE:
+                    if (doms[0].nodeValue or "").strip():
+                        break
+                    doms.pop(0)
+            if (
+                not doms
+                or (child := self._adopt(parent, doms[0], vdom, dispatch)) is None
+            ):
+                break
+            doms.pop(0)
+            children.append(child)
+
+        # The markup does not match the view from here on, so rebuild the rest.
+        for dom in doms:
+            parent.ops.remove_child(parent.dom, dom)
+        for vdom in vdoms[len(children) :]:
+            (child, patches) = self.patch(dispatch, None, vdom)
+            assert child is not None
+            for p in patches:
+                parent.apply(p)
+            children.append(child)
+        return children
+
+    def render_to_string(self) -> str:
+        """Render the initial view to HTML, e.g. to pre-render it on a server."""
+        (state, _) = self._init()
+        return render_to_string(self._view(state))
+
+    def _main(self, root_node: Node = _DetachedRoot()) -> None:
+        self._start(root_node, hydrate=False)
+
+    def _start(self, root_node: Node, hydrate: bool) -> None:
+        state, effects = self._init()
+        root = NodeDomElement(tag="__root__", props={}, children=[], node=root_node)
+
+        def render() -> None:
+            nonlocal root
+            if self.profiler is not None:
+                self.profiler.begin_frame()
+            (root, _) = self.patch(
+                dispatch, root, VDomElement("__root__", {}, [self._run_view(state)])
+            )
+            self._flush()
+            if self.profiler is not None:
+                self.profiler.end_frame()
+
+        def dispatch(msg: M) -> None:
+            nonlocal state
+            old_state = state
+            (state, effects) = self._run_update(msg, old_state)
+            if state != old_state:
+                self._subscriber.update(state, dispatch)
+                self._enqueue(render)
+            self._run_effects(dispatch, effects)
+
+        self._subscriber.update(state, dispatch)
+        if hydrate and isinstance(root_node, DomNode):
+            root_dom_node = cast(DomNode[M], root_node)
+            children = self._hydrate_children(
+                root_dom_node, [self._run_view(state)], dispatch
+            )
+            root = NodeDomElement("__root__", {}, children, root_dom_node)
+            self._flush()
+        else:
+            self._enqueue(render)
+        self._run_effects(dispatch, effects)
+
+    def _root_node(self, root: str) -> DomNode[M]:
+        root_dom = get_backend().document.getElementById(root)
+        if root_dom is None:
+            raise ValueError(f"Root element not found: {root}")
+        if self._delegator is not None:
+            self._delegator.attach(root_dom)
+        return DomNode[M](root_dom, ops=self._buffer, profiler=self.profiler)
+
     def main(
         self,
         root: str,
     ) -> None:
-        self._main(DomNode[M](document.getElementById(root)))
+        self._main(self._root_node(root))
+
+    def hydrate(self, root: str) -> None:
+        """Start the app on markup produced by `render_to_string`.
+
+        Matching elements are adopted and get their listeners attached; the
+        first mismatch and anything after it in the same parent is rebuilt.
+        """
+        self._start(self._root_node(root), hydrate=True)
@@ -0,0 +1,371 @@
+from typing import Any, Callable, Iterable, Protocol, TypeVar, cast
+
+
+class Style(Protocol):
+    @property
+    def cssText(self) -> str:
+        ...
+
+    @cssText.setter
+    def cssText(self, text: str) -> None:
+        ...
+
+    def setProperty(self, name: str, value: str) -> None:
+        ...
+
+    def removeProperty(self, name: str) -> str:
+        ...
+
+
+class Node(Protocol):
+    """A node of the DOM, i.e. an element or a text."""
+
+    @property
+    def nodeType(self) -> int:
+        ...
+
+    @property
+    def parentNode(self) -> "Node | None":
+        ...
+
+    @property
+    def childNodes(self) -> Iterable["Node"]:
+        ...
+
+    @property
+    def nodeValue(self) -> str | None:
+        ...
+
+    @nodeValue.setter
+    def nodeValue(self, text: str) -> None:
+        ...
+
+    def insertBefore(self, child: "Node", reference: "Node | None") -> Any:
+        ...
+
+    def removeChild(self, child: "Node") -> Any:
+        ...
+
+    def cloneNode(self, deep: bool = ...) -> "Node":
+        ...
+
+    def addEventListener(
+        self, event_type: str, listener: Any, options: Any = ...
+    ) -> None:
+        ...
+
+    def removeEventListener(
+        self, event_type: str, listener: Any, options: Any = ...
+    ) -> None:
+        ...
+
+
+class Element(Node, Protocol):
+    @property
+    def localName(self) -> str:
+        ...
+
+    @property
+    def style(self) -> Style:
+        ...
+
+    def getAttribute(self, name: str) -> str | None:
+        ...
+
+    def getAttributeNames(self) -> Iterable[str]:
+        ...
+
+    def setAttribute(self, name: str, value: Any) -> None:
+        ...
+
+    def removeAttribute(self, name: str) -> None:
+        ...
+
+    def focus(self) -> None:
+        ...
+
+
+class Document(Protocol):
+    @property
+    def hidden(self) -> bool:
+        ...
+
+    def createElement(self, tag: str, options: Any = ...) -> Element:
+        ...
+
+    def createTextNode(self, text: str) -> Node:
+        ...
+
+    def getElementById(self, id: str) -> Element | None:
+        ...
+
+    def addEventListener(
+        self, event_type: str, listener: Any, options: Any = ...
+    ) -> None:
+        ...
+
+    def removeEventListener(
+        self, event_type: str, listener: Any, options: Any = ...
+    ) -> None:
+        ...
+
+
+class Performance(Protocol):
+    def now(self) -> float:
+        ...
+
+
+class Window(Protocol):
+    @property
+    def performance(self) -> Performance:
+        ...
+
+    def requestAnimationFrame(self, callback: Any) -> int:
+        ...
+
+    def cancelAnimationFrame(self, handle: int) -> None:
+        ...
+
+    def setTimeout(self, callback: Any, delay: float = ...) -> int:
+        ...
+
+
+class Storage(Protocol):
+    @property
+    def length(self) -> int:
+        ...
+
+    def getItem(self, key: str) -> str | None:
+        ...
+
+    def setItem(self, key: str, value: str) -> None:
+        ...
+
+    def removeItem(self, key: str) -> None:
+        ...
+
+    def object_keys(self) -> Any:
+        ...
+
+
+class AsyncStore(Protocol):
+    async def get(self, key: str) -> Any | None:
+        ...
+
+    async def put(self, key: str, value: Any) -> None:
+        ...
+
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def keys(self) -> list[str]:
+        ...
+
+    async def items(self) -> list[tuple[str, Any]]:
+        ...
+
+
+class Location(Protocol):
+    href: str
+
+    def assign(self, url: str) -> None:
+        ...
+
+    def reload(self) -> None:
+        ...
+
+    def replace(self, url: str) -> None:
+        ...
+
+
+Extractor = Callable[[Any], list[Any]]
+PatchInterpreter = Callable[[list[Any], list[Any]], None]
+
+
+class Backend(Protocol):
+    """The browser environment alfort_dom renders into."""
+
+    @property
+    def document(self) -> Document:
+        ...
+
+    @property
+    def window(self) -> Window:
+        ...
+
+    @property
+    def local_storage(self) -> Storage:
+        ...
+
+    @property
+    def location(self) -> Location:
+        ...
+
+    def create_proxy(self, obj: Any) -> Any:
+        ...
+
+    def create_once_callable(self, fun: Callable[..., Any]) -> Any:
+        ...
+
+    def destroy_proxy(self, proxy: Any) -> None:
+        ...
+
+    def to_js(self, obj: Any) -> Any:
+        ...
+
+    def patch_interpreter(self) -> PatchInterpreter:
+        ...
+
+    def compile_extractor(self, paths: tuple[str, ...]) -> Extractor:
+        ...
+
+    def open_store(self, name: str) -> AsyncStore:
+        ...
+
+    def storage_snapshot(self) -> dict[str, str]:
+        ...
+
+    def storage_write(self, changes: dict[str, str | None]) -> None:
+        ...
+
+
+class PyodideBackend:
+    """Backend running in the browser through Pyodide's FFI."""
+
+    def __init__(self) -> None:
+        import js
+        import pyodide
+
+        self._js = js
+        self._pyodide = pyodide
+        self._interpreter: PatchInterpreter | None = None
+        self._snapshot: Any | None = None
+        self._storage_write: Any | None = None
+
+    @property
+    def document(self) -> Document:
+        return cast(Document, self._js.document)
+
+    @property
+    def window(self) -> Window:
+        return cast(Window, self._js.window)
+
+    @property
+    def local_storage(self) -> Storage:
+        return cast(Storage, self._js.localStorage)
+
+    @property
+    def location(self) -> Location:
+        return cast(Location, self._js.location)
+
+    def create_proxy(self, obj: Any) -> Any:
+        return self._pyodide.create_proxy(obj)
+
+    def create_once_callable(self, fun: Callable[..., Any]) -> Any:
+        return self._pyodide.create_once_callable(fun)
+
+    def destroy_proxy(self, proxy: Any) -> None:
+        proxy.destroy()
+
+    def to_js(self, obj: Any) -> Any:
+        return self._pyodide.to_js(obj, dict_converter=self._js.Object.fromEntries)
+
+    def patch_interpreter(self) -> PatchInterpreter:
+        if self._interpreter is None:
+            from .batch import INTERPRETER_SOURCE
+
+            fun = self._js.Function.new("nodes", "ops", INTERPRETER_SOURCE)
+            to_js = self._pyodide.to_js
+
+            def _interpreter(nodes: list[Any], ops: list[Any]) -> None:
+                fun(to_js(nodes), to_js(ops))
+
+            self._interpreter = _interpreter
+        return self._interpreter
+
+    def compile_extractor(self, paths: tuple[str, ...]) -> Extractor:
+        from .decode import extractor_source
+
+        fun = self._js.Function.new("e", extractor_source(paths))
+
+        def _extractor(event: Any) -> list[Any]:
+            return fun(event).to_py()
+
+        return _extractor
+
+    def open_store(self, name: str) -> AsyncStore:
+        from .indexed_db import IndexedDBStore
+
+        return IndexedDBStore(name)
+
+    def storage_snapshot(self) -> dict[str, str]:
+        from .local_storage import SNAPSHOT_SOURCE
+
+        if self._snapshot is None:
+            self._snapshot = self._js.Function.new("storage", SNAPSHOT_SOURCE)
+        return dict(self._snapshot(self._js.localStorage).to_py())
+
+    def storage_write(self, changes: dict[str, str | None]) -> None:
+        from .local_storage import WRITE_SOURCE
+
+        if self._storage_write is None:
+            self._storage_write = self._js.Function.new(
+                "storage", "items", WRITE_SOURCE
+            )
+        items = self._pyodide.to_js(list(changes.items()))
+        self._storage_write(self._js.localStorage, items)
+
+
+class PyodideWorkerBackend(PyodideBackend):
+    """Backend of a Web Worker running a `alfort_dom.worker.WorkerApp`.
+
+    Workers have no document, and the events their handlers get are plain
+    Python objects, so event fields are read in Python.
+    """
+
+    @property
+    def document(self) -> Document:
+        raise RuntimeError("Web Workers have no document")
+
+    @property
+    def window(self) -> Window:
+        # the worker's global scope has the timers and animation frames
+        return cast(Window, self._js)
+
+    def compile_extractor(self, paths: tuple[str, ...]) -> Extractor:
+        from .decode import extract
+
+        def _extractor(event: Any) -> list[Any]:
+            return [extract(event, p) for p in paths]
+
+        return _extractor
+
+
+_backend: Backend | None = None
+
+
+def _default_backend() -> Backend:
+    try:
+        return PyodideBackend()
+    except ImportError:
+        from .headless import HeadlessBackend
+
+        return HeadlessBackend()
+
+
+def get_backend() -> Backend:
+    """Return the active backend, defaulting to Pyodide when it is available
+    and to the in-memory headless DOM otherwise."""
+    global _backend
+    if _backend is None:
+        _backend = _default_backend()
+    return _backend
+
+
+B = TypeVar("B", bound=Backend)
+
+
+def use_backend(backend: B) -> B:
+    global _backend
+    _backend = backend
+    return backend
@@ -0,0 +1,125 @@
+from typing import Any
+
+from .backend import get_backend
+
+OP_INSERT_BEFORE = 0
+OP_REMOVE_CHILD = 1
+OP_SET_ATTRIBUTE = 2
+OP_REMOVE_ATTRIBUTE = 3
+OP_SET_PROPERTY = 4
+OP_SET_STYLE = 5
+OP_SET_TEXT = 6
+# Ops of the patch stream of split mode, see `alfort_dom.worker`.
+OP_CREATE_ELEMENT = 7  # (op, id, tag, None)
+OP_CREATE_TEXT = 8  # (op, id, text, None)
+OP_RELEASE = 9  # (op, id, None, None)
+OP_LISTEN = 10  # (op, root id, event type, paths)
+
+# Every command occupies exactly this many slots of the flat op buffer:
+# (op code, target node id, first argument, second argument)
+OP_WIDTH = 4
+NO_NODE = -1
+
+INTERPRETER_SOURCE = """
+for (let i = 0; i < ops.length; i += 4) {
+  const el = nodes[ops[i + 1]];
+  const a = ops[i + 2];
+  const b = ops[i + 3];
+  switch (ops[i]) {
+    case 0: el.insertBefore(nodes[a], b < 0 ? null : nodes[b]); break;
+    case 1: el.removeChild(nodes[a]); break;
+    case 2: el.setAttribute(a, b); break;
+    case 3: el.removeAttribute(a); break;
+    case 4: el[a] = b; break;
+    case 5: el.style[a] = b; break;
+    case 6: el.nodeValue = a; break;
+  }
+}
+"""
+
+
+def replay(nodes: list[Any], ops: list[Any]) -> None:
+    """Python counterpart of INTERPRETER_SOURCE for backends without JS."""
+    for i in range(0, len(ops), OP_WIDTH):
+        op, el, a, b = ops[i], nodes[ops[i + 1]], ops[i + 2], ops[i + 3]
+        if op == OP_INSERT_BEFORE:
+            el.insertBefore(nodes[a], None if b < 0 else nodes[b])
+        elif op == OP_REMOVE_CHILD:
+            el.removeChild(nodes[a])
+        elif op == OP_SET_ATTRIBUTE:
+            el.setAttribute(a, b)
+        elif op == OP_REMOVE_ATTRIBUTE:
+            el.removeAttribute(a)
+        elif op == OP_SET_PROPERTY:
+            setattr(el, a, b)
+        elif op == OP_SET_STYLE:
+            setattr(el.style, a, b)
+        elif op == OP_SET_TEXT:
+            el.nodeValue = a
+        else:
+            raise ValueError(f"Unknown op: {op}")
+
+
+class PatchBuffer:
+    """Records DOM operations and replays them with a single JS call.
+
+    Nodes are referred to by their index in a per-flush node table, so the
+    buffer itself only holds op codes, small integers and plain values.
+    """
+
+    nodes: list[Any]
+    ops: list[Any]
+    _node_ids: dict[int, int]
+
+    def __init__(self) -> None:
+        self.nodes = []
+        self.ops = []
+        self._node_ids = {}
+
+    def __len__(self) -> int:
+        return len(self.ops) // OP_WIDTH
+
+    def _node_id(self, dom: Any) -> int:
+        key = id(dom)
+        if (node_id := self._node_ids.get(key)) is None:
+            node_id = len(self.nodes)
+            self._node_ids[key] = node_id
+            self.nodes.append(dom)
+        return node_id
+
+    def _push(self, op: int, dom: Any, a: Any = None, b: Any = None) -> None:
+        self.ops.extend((op, self._node_id(dom), a, b))
+
+    def insert_before(self, parent: Any, child: Any, reference: Any | None) -> None:
+        ref_id = NO_NODE if reference is None else self._node_id(reference)
+        self._push(OP_INSERT_BEFORE, parent, self._node_id(child), ref_id)
+
+    def remove_child(self, parent: Any, child: Any) -> None:
+        self._push(OP_REMOVE_CHILD, parent, self._node_id(child))
+
+    def set_attribute(self, dom: Any, name: str, value: Any) -> None:
+        self._push(OP_SET_ATTRIBUTE, dom, name, value)
+
+    def remove_attribute(self, dom: Any, name: str) -> None:
+        self._push(OP_REMOVE_ATTRIBUTE, dom, name)
+
+    def set_property(self, dom: Any, name: str, value: Any) -> None:
+        self._push(OP_SET_PROPERTY, dom, name, value)
+
+    def set_style(self, dom: Any, name: str, value: Any) -> None:
+        self._push(OP_SET_STYLE, dom, name, value)
+
+    def set_text(self, dom: Any, text: str) -> None:
+        self._push(OP_SET_TEXT, dom, text)
+
+    def clear(self) -> None:
+        self.nodes = []
+        self.ops = []
+        self._node_ids = {}
+
+    def flush(self) -> None:
+        if not self.ops:
+            return
+        nodes, ops = self.nodes, self.ops
+        self.clear()
+        get_backend().patch_interpreter()(nodes, ops)
@@ -0,0 +1,270 @@
+"""Compact binary encoding of the patch stream and of event payloads.
+
+A message is a kind byte followed by its body:
+
+    PATCH  ops...                      ops of the flat 4-slot op buffer
+    EVENT  name ids values             an event forwarded to the worker
+
+Unsigned integers, i.e. node ids, counts and lengths, are LEB128 varints and
+signed ones are zigzag varints. Each op is its op code byte followed by
+varints for its node ids and by its arguments:
+
+    INSERT_BEFORE     parent child reference+1 (0 for none)
+    REMOVE_CHILD      parent child
+    SET_ATTRIBUTE     node name value
+    REMOVE_ATTRIBUTE  node name
+    SET_PROPERTY      node name value
+    SET_STYLE         node name value
+    SET_TEXT          node string
+    CREATE_ELEMENT    node name
+    CREATE_TEXT       node string
+    RELEASE           node
+    LISTEN            node name count name...
+
+A `name` (tag, attribute, property and style names, event types and event
+paths) is interned: varint 0 followed by a string defines the next entry of
+the table, any other varint n refers to entry n - 1. Both ends keep their
+table for the lifetime of the connection, so a name crosses once. A `string`
+is a varint byte length followed by UTF-8. A `value` is a type byte:
+
+    NONE  FALSE  TRUE  INT zigzag  FLOAT float64 LE  STRING string  LIST count value...
+
+Decoding reads from any buffer, e.g. the memoryview of a transferred
+ArrayBuffer, without copying it.
+"""
+import struct
+from typing import Any, Sequence, cast
+
+from .batch import (
+    OP_CREATE_ELEMENT,
+    OP_CREATE_TEXT,
+    OP_INSERT_BEFORE,
+    OP_LISTEN,
+    OP_RELEASE,
+    OP_REMOVE_ATTRIBUTE,
+    OP_REMOVE_CHILD,
+    OP_SET_ATTRIBUTE,
+    OP_SET_PROPERTY,
+    OP_SET_STYLE,
+    OP_SET_TEXT,
+    OP_WIDTH,
+)
+
+KIND_PATCH = 1
+KIND_EVENT = 2
+
+T_NONE = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_FLOAT = 4
+T_STRING = 5
+T_LIST = 6
+
+_FLOAT = struct.Struct("<d")
+
+# Arguments of each op after its node id: c is a child node id, r a reference
+# node id, n an interned name, s a string, v a value and l a list of names.
+_LAYOUTS: dict[int, str] = {
+    OP_INSERT_BEFORE: "cr",
+    OP_REMOVE_CHILD: "c",
+    OP_SET_ATTRIBUTE: "nv",
+    OP_REMOVE_ATTRIBUTE: "n",
+    OP_SET_PROPERTY: "nv",
+    OP_SET_STYLE: "nv",
+    OP_SET_TEXT: "s",
+    OP_CREATE_ELEMENT: "n",
+    OP_CREATE_TEXT: "s",
+    OP_RELEASE: "",
+    OP_LISTEN: "nl",
+}
+
+
+class Codec:
+    """Encoder of the messages sent over one connection and decoder of those
+    received, each direction with its own table of interned names."""
+
+    _sent: dict[str, int]
+    _received: list[str]
+
+    def __init__(self) -> None:
+        self._sent = {}
+        self._received = []
+
+    # encoding
+
+    @staticmethod
+    def _uint(out: bytearray, n: int) -> None:
+        while n > 0x7F:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def _string(self, out: bytearray, s: str) -> None:
+        data = s.encode()
+        self._uint(out, len(data))
+        out += data
+
+    def _name(self, out: bytearray, name: str) -> None:
+        if (index := self._sent.get(name)) is not None:
+            self._uint(out, index + 1)
+            return
+        self._sent[name] = len(self._sent)
+        out.append(0)
+        self._string(out, name)
+
+    def _value(self, out: bytearray, value: Any) -> None:
+        if value is None:
+            out.append(T_NONE)
+        elif value is False:
+            out.append(T_FALSE)
+        elif value is True:
+            out.append(T_TRUE)
+        elif isinstance(value, int):
+            out.append(T_INT)
+            self._uint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+        elif isinstance(value, float):
+            out.append(T_FLOAT)
+            out += _FLOAT.pack(value)
+        elif isinstance(value, str):
+            out.append(T_STRING)
+            self._string(out, value)
+        elif isinstance(value, list | tuple):
+            items = cast(Sequence[Any], value)
+            out.append(T_LIST)
+            self._uint(out, len(items))
+            for v in items:
+                self._value(out, v)
+        else:
+            raise TypeError(f"Cannot encode {type(value).__name__}: {value!r}")
+
+    def encode_patch(self, ops: list[Any]) -> bytearray:
+        out = bytearray([KIND_PATCH])
+        uint = self._uint
+        for i in range(0, len(ops), OP_WIDTH):
+            op, node, a, b = ops[i : i + OP_WIDTH]
+            out.append(op)
+            uint(out, node)
+            for field, arg in zip(_LAYOUTS[op], (a, b)):
+                if field == "c":
+                    uint(out, arg)
+                elif field == "r":
+                    uint(out, arg + 1)
+                elif field == "n":
+                    self._name(out, arg)
+                elif field == "s":
+                    self._string(out, arg)
+                elif field == "v":
+                    self._value(out, arg)
+                else:
+                    uint(out, len(arg))
+                    for name in arg:
+                        self._name(out, name)
+        return out
+
+    def encode_event(
+        self, event_type: str, ids: list[int], values: list[Any]
+    ) -> bytearray:
+        out = bytearray([KIND_EVENT])
+        self._name(out, event_type)
+        self._uint(out, len(ids))
+        for node_id in ids:
+            self._uint(out, node_id)
+        self._value(out, values)
+        return out
+
+    # decoding
+
+    def decode(self, data: Any) -> list[Any]:
+        """Decode a message into its list form, as sent in non-binary mode."""
+        reader = _Reader(memoryview(data).cast("B"), self._received)
+        kind = reader.byte()
+        if kind == KIND_PATCH:
+            return ["patch", reader.ops()]
+        if kind == KIND_EVENT:
+            event_type = reader.name()
+            ids = [reader.uint() for _ in range(reader.uint())]
+            return ["event", event_type, ids, reader.value()]
+        raise ValueError(f"Unknown message kind: {kind}")
+
+
+class _Reader:
+    def __init__(self, data: memoryview, names: list[str]) -> None:
+        self.data = data
+        self.names = names
+        self.pos = 0
+
+    def byte(self) -> int:
+        b = self.data[self.pos]
+        self.pos += 1
+        return b
+
+    def uint(self) -> int:
+        data, pos = self.data, self.pos
+        n = shift = 0
+        while True:
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                self.pos = pos
+                return n
+            shift += 7
+
+    def string(self) -> str:
+        size = self.uint()
+        s = str(self.data[self.pos : self.pos + size], "utf-8")
+        self.pos += size
+        return s
+
+    def name(self) -> str:
+        index = self.uint()
+        if index == 0:
+            name = self.string()
+            self.names.append(name)
+            return name
+        return self.names[index - 1]
+
+    def value(self) -> Any:
+        t = self.byte()
+        if t == T_NONE:
+            return None
+        if t == T_FALSE:
+            return False
+        if t == T_TRUE:
+            return True
+        if t == T_INT:
+            n = self.uint()
+            return (n >> 1) ^ -(n & 1)
+        if t == T_FLOAT:
+            (f,) = _FLOAT.unpack_from(self.data, self.pos)
+            self.pos += _FLOAT.size
+            return f
+        if t == T_STRING:
+            return self.string()
+        if t == T_LIST:
+            return [self.value() for _ in range(self.uint())]
+        raise ValueError(f"Unknown value type: {t}")
+
+    def ops(self) -> list[Any]:
+        ops: list[Any] = []
+        end = len(self.data)
+        while self.pos < end:
+            op = self.byte()
+            node = self.uint()
+            args: list[Any] = [None, None]
+            for i, field in enumerate(_LAYOUTS[op]):
+                if field == "c":
+                    args[i] = self.uint()
+                elif field == "r":
+                    args[i] = self.uint() - 1
+                elif field == "n":
+                    args[i] = self.name()
+                elif field == "s":
+                    args[i] = self.string()
+                elif field == "v":
+                    args[i] = self.value()
+                else:
+                    args[i] = [self.name() for _ in range(self.uint())]
+            ops.extend((op, node, *args))
+        return ops
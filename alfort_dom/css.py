@@ -0,0 +1,17 @@
+import re
+from typing import Any, Mapping
+
+_UPPER = re.compile("([A-Z])")
+
+
+def to_css_name(name: str) -> str:
+    """Convert a camelCase style name such as `marginTop` to `margin-top`."""
+    if name.startswith("--") or "-" in name:
+        return name
+    return _UPPER.sub(lambda m: "-" + m.group(1).lower(), name)
+
+
+def to_css_text(style: Mapping[str, Any]) -> str:
+    return " ".join(
+        f"{to_css_name(k)}: {v};" for k, v in style.items() if v is not None and v != ""
+    )
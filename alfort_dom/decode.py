@@ -0,0 +1,82 @@
+"""Decoders turn DOM events into messages with a single call into JS.
+
+    el("input", {"oninput": decode(SetText, text="target.value")})
+    on_mousemove(decode(Move, x="clientX", y="clientY"))
+
+Each keyword names a field and gives its dotted path on the event. The fields
+are read by one compiled JS function, so a handler costs one FFI round-trip
+instead of one per attribute access, and `to_msg` gets plain Python values.
+"""
+import re
+from typing import Any, Callable, Generic, TypeVar
+
+from .backend import Backend, Extractor, get_backend
+
+Msg = TypeVar("Msg")
+
+_PATH = re.compile(r"[A-Za-z_$][\w$]*(\.[A-Za-z_$][\w$]*)*")
+
+
+def extractor_source(paths: tuple[str, ...]) -> str:
+    """Body of a JS function of `e` returning the values at `paths`."""
+    values = ", ".join("e?." + p.replace(".", "?.") for p in paths)
+    return f"return [{values}];"
+
+
+def extract(event: Any, path: str) -> Any:
+    """Python counterpart of the compiled extractor for a single path."""
+    value = event
+    for name in path.split("."):
+        if value is None:
+            break
+        value = getattr(value, name, None)
+    return value
+
+
+_extractors: dict[tuple[str, ...], Extractor] = {}
+_extractors_backend: Backend | None = None
+
+
+def _get_extractor(paths: tuple[str, ...]) -> Extractor:
+    global _extractors_backend
+    backend = get_backend()
+    if backend is not _extractors_backend:
+        _extractors.clear()
+        _extractors_backend = backend
+    if (extractor := _extractors.get(paths)) is None:
+        extractor = backend.compile_extractor(paths)
+        _extractors[paths] = extractor
+    return extractor
+
+
+class Decoder(Generic[Msg]):
+    names: tuple[str, ...]
+    paths: tuple[str, ...]
+
+    def __init__(self, to_msg: Callable[..., Msg], fields: dict[str, str]) -> None:
+        for path in fields.values():
+            if not _PATH.fullmatch(path):
+                raise ValueError(f"Invalid event path: {path}")
+        self.to_msg = to_msg
+        self.names = tuple(fields.keys())
+        self.paths = tuple(fields.values())
+
+    def __call__(self, event: Any) -> Msg:
+        values = _get_extractor(self.paths)(event)
+        return self.to_msg(**dict(zip(self.names, values)))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Decoder):
+            return False
+        return (self.to_msg, self.names, self.paths) == (
+            other.to_msg,
+            other.names,
+            other.paths,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.names, self.paths))
+
+
+def decode(to_msg: Callable[..., Msg], **fields: str) -> Decoder[Msg]:
+    return Decoder(to_msg, fields)
@@ -0,0 +1,98 @@
+from itertools import count
+from typing import Any, Protocol
+from weakref import WeakValueDictionary
+
+from .backend import Element, Node
+from .proxy import create_proxy
+
+NODE_ID_ATTRIBUTE = "data-alfort-id"
+
+ELEMENT_NODE = 1
+NON_BUBBLING_EVENTS = frozenset(
+    [
+        "blur",
+        "focus",
+        "load",
+        "unload",
+        "error",
+        "scroll",
+        "mouseenter",
+        "mouseleave",
+        "pointerenter",
+        "pointerleave",
+    ]
+)
+
+
+class DelegatedNode(Protocol):
+    dom: Node
+
+    def handle(self, event: Any) -> None:
+        ...
+
+
+class EventDelegator:
+    """Dispatches DOM events for a whole app from one listener per event type.
+
+    Nodes with handlers are tagged with a `data-alfort-id` attribute. The
+    listener is registered on the root in the capture phase, so events that
+    do not bubble are seen too, and it walks from the event target up to the
+    root calling the Python-side handlers of the registered nodes.
+    """
+
+    _root: Element | None
+    _nodes: WeakValueDictionary[str, DelegatedNode]
+    _event_types: set[str]
+    _listener: Any | None
+
+    def __init__(self) -> None:
+        self._root = None
+        self._nodes = WeakValueDictionary()
+        self._event_types = set()
+        self._listener = None
+        self._ids = count()
+
+    def attach(self, root: Element) -> None:
+        self._root = root
+        for event_type in self._event_types:
+            self._add_listener(event_type)
+
+    def register(self, node: DelegatedNode) -> str:
+        node_id = str(next(self._ids))
+        self._nodes[node_id] = node
+        return node_id
+
+    def unregister(self, node_id: str) -> None:
+        self._nodes.pop(node_id, None)
+
+    def listen(self, event_type: str, handler: Any = None) -> None:
+        """Listen for `event_type` on the root, once per event type.
+
+        `handler` is the handler being bound to the event type. It is unused
+        here; subclasses may look at it, e.g. `RemoteDelegator` collects the
+        event fields which its decoders read.
+        """
+        if event_type in self._event_types:
+            return
+        self._event_types.add(event_type)
+        if self._root is not None:
+            self._add_listener(event_type)
+
+    def _add_listener(self, event_type: str) -> None:
+        if self._root is None:
+            return
+        if self._listener is None:
+            self._listener = create_proxy(self._on_event)
+        self._root.addEventListener(event_type, self._listener, True)
+
+    def _on_event(self, event: Any) -> None:
+        bubbles = event.type not in NON_BUBBLING_EVENTS
+        target = event.target
+        while target is not None and target != self._root:
+            if target.nodeType == ELEMENT_NODE:
+                node_id = target.getAttribute(NODE_ID_ATTRIBUTE)
+                if node_id is not None and (node := self._nodes.get(node_id)):
+                    node.handle(event)
+            if not bubbles or event.cancelBubble:
+                break
+            target = target.parentNode
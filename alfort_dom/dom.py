@@ -2,8 +2,9 @@ import functools
 from typing import Any, Callable, Protocol, TypeVar
 
 from alfort import Dispatch, Effect
-from js import document, window
-from pyodide import create_proxy
+
+from .backend import get_backend
+from .proxy import create_once_callable
 
 M = TypeVar("M")
 
@@ -13,7 +14,7 @@ class HTMLElement(Protocol):
         ...
 
     @property
-    def nodeValue(self) -> str:
+    def nodeValue(self) -> str | None:
         ...
 
     @nodeValue.setter
@@ -28,10 +29,11 @@ def dom_effect(
         @functools.wraps(fun)
         async def _wrapped(dispatch: Dispatch[M]) -> None:
             def _f(_: Any) -> None:
-                dom = document.getElementById(dom_id)
-                fun(dom, dispatch)
+                dom = get_backend().document.getElementById(dom_id)
+                if dom is not None:
+                    fun(dom, dispatch)
 
-            window.requestAnimationFrame(create_proxy(_f))
+            get_backend().window.requestAnimationFrame(create_once_callable(_f))
 
         return _wrapped
 
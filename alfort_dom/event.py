@@ -1,9 +1,11 @@
-from typing import Any, Callable, Generic, TypeAlias, TypeVar
+from math import inf
+from typing import Any, Callable, Generic, TypeAlias, TypeVar, cast
 
 from alfort import Dispatch
 from alfort.sub import Subscription, UnSubscription, subscription
-from js import document
-from pyodide import create_proxy
+
+from .backend import Backend, get_backend
+from .proxy import create_once_callable, create_proxy, destroy_proxy
 
 Msg = TypeVar("Msg")
 Handler: TypeAlias = Callable[[Any], Msg]
@@ -25,6 +27,9 @@ class _Handler(Generic[Msg]):
             return False
         return self.key == other.key
 
+    def __hash__(self) -> int:
+        return hash(self.key)
+
 
 def handler(key: Any | None = None) -> Callable[[Handler[Msg]], _Handler[Msg]]:
     def _constructor(f: Handler[Msg]) -> _Handler[Msg]:
@@ -34,33 +39,232 @@ def handler(key: Any | None = None) -> Callable[[Handler[Msg]], _Handler[Msg]]:
     return _constructor
 
 
-_document_callbacks: dict[str, Callback] = {}
+class _LimitState:
+    def __init__(self, owner: "Limiter[Any]") -> None:
+        self.owner = owner
+        self.last = -inf
+        self.deadline = 0.0
+        self.event: Any = None
+        self.pending = False
 
 
-@create_proxy
-def _document_listener(event: Any) -> None:
-    if callback := _document_callbacks.get(event.type):
-        callback(event)
+class Limiter(Generic[Msg]):
+    """Handler wrapper deciding which events reach `handler`.
 
+    Dropped events never call the handler, so no message is created for them.
+    A limiter re-created by a view takes over the timing state of the one it
+    replaces, provided both are of the same kind.
+    """
 
-def _create_subscriber(
-    event_type: str,
-) -> Callable[[Handler[Msg]], Subscription[Msg]]:
-    def _subscriber(handler: Handler[Msg]) -> Subscription[Msg]:
-        @subscription()
-        def _subscription(dispatch: Dispatch[Msg]) -> UnSubscription:
-            def _callback(e: Any) -> None:
-                dispatch(handler(e))
+    handler: Handler[Msg]
+    _state: _LimitState
+
+    def __init__(self, handler: Handler[Msg]) -> None:
+        self.handler = handler
+        self._state = _LimitState(self)
+
+    def __call__(self, event: Any) -> Msg:
+        return self.handler(event)
+
+    def _params(self) -> tuple[Any, ...]:
+        return ()
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return False
+        return self._params() == other._params() and self.handler == other.handler
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._params()))
+
+    def adopt(self, other: "Limiter[Any]") -> None:
+        if type(other) is type(self) and self._params() == other._params():
+            self._state = other._state
+            self._state.owner = self
+
+    def handle(self, event: Any, dispatch: Dispatch[Msg]) -> None:
+        dispatch(self.handler(event))
+
+
+def _now() -> float:
+    return get_backend().window.performance.now()
+
+
+def _fire(state: _LimitState, dispatch: Dispatch[Any]) -> None:
+    (event, state.event, state.pending) = (state.event, None, False)
+    dispatch(state.owner.handler(event))
+
+
+class _Throttle(Limiter[Msg]):
+    def __init__(self, ms: float, handler: Handler[Msg], trailing: bool) -> None:
+        super().__init__(handler)
+        self.ms = ms
+        self.trailing = trailing
+
+    def _params(self) -> tuple[Any, ...]:
+        return (self.ms, self.trailing)
+
+    def handle(self, event: Any, dispatch: Dispatch[Msg]) -> None:
+        state = self._state
+        now = _now()
+        if not state.pending and now - state.last >= self.ms:
+            state.last = now
+            dispatch(self.handler(event))
+            return
+        if not self.trailing:
+            return
+
+        state.event = event
+        if not state.pending:
+            state.pending = True
+
+            def _trail(*_: Any) -> None:
+                state.last = _now()
+                _fire(state, dispatch)
+
+            get_backend().window.setTimeout(
+                create_once_callable(_trail), state.last + self.ms - now
+            )
+
+
+class _Debounce(Limiter[Msg]):
+    def __init__(self, ms: float, handler: Handler[Msg]) -> None:
+        super().__init__(handler)
+        self.ms = ms
+
+    def _params(self) -> tuple[Any, ...]:
+        return (self.ms,)
+
+    def handle(self, event: Any, dispatch: Dispatch[Msg]) -> None:
+        state = self._state
+        state.event = event
+        state.deadline = _now() + self.ms
+        if state.pending:
+            return
+        state.pending = True
+
+        def _check(*_: Any) -> None:
+            if (remaining := state.deadline - _now()) > 0:
+                get_backend().window.setTimeout(create_once_callable(_check), remaining)
+            else:
+                _fire(state, dispatch)
+
+        get_backend().window.setTimeout(create_once_callable(_check), self.ms)
+
+
+class _SampleFrame(Limiter[Msg]):
+    def handle(self, event: Any, dispatch: Dispatch[Msg]) -> None:
+        state = self._state
+        state.event = event
+        if not state.pending:
+            state.pending = True
+
+            def _frame(*_: Any) -> None:
+                _fire(state, dispatch)
+
+            get_backend().window.requestAnimationFrame(create_once_callable(_frame))
+
+
+def throttle(ms: float, handler: Handler[Msg], trailing: bool = True) -> Limiter[Msg]:
+    """Pass at most one event per `ms`; with `trailing`, the latest dropped
+    event is delivered when the interval ends."""
+    return _Throttle(ms, handler, trailing)
+
+
+def debounce(ms: float, handler: Handler[Msg]) -> Limiter[Msg]:
+    """Deliver the latest event once no event has arrived for `ms`."""
+    return _Debounce(ms, handler)
+
+
+def sample_frame(handler: Handler[Msg]) -> Limiter[Msg]:
+    """Deliver the latest event once per animation frame."""
+    return _SampleFrame(handler)
 
-            def _unsubscription() -> None:
-                document.removeEventListener(event_type, _document_listener)
-                del _document_callbacks[event_type]
 
-            _document_callbacks[event_type] = _callback
-            document.addEventListener(event_type, _document_listener)
-            return _unsubscription
+def handle_event(handler: Handler[Msg], event: Any, dispatch: Dispatch[Msg]) -> None:
+    if isinstance(handler, Limiter):
+        cast(Limiter[Msg], handler).handle(event, dispatch)
+    else:
+        dispatch(handler(event))
 
-        return _subscription
+
+class _Listener:
+    """One native listener on `target`, fanning its events out to callbacks."""
+
+    def __init__(self, backend: Backend, target: Any, event_type: str) -> None:
+        self.backend = backend
+        self.target = target
+        self.event_type = event_type
+        self.callbacks: list[Callback] = []
+        self.proxy = create_proxy(self._on_event)
+        if event_type in PASSIVE_EVENTS:
+            options = backend.to_js({"passive": True})
+            target.addEventListener(event_type, self.proxy, options)
+        else:
+            target.addEventListener(event_type, self.proxy)
+
+    def _on_event(self, event: Any) -> None:
+        for callback in tuple(self.callbacks):
+            callback(event)
+
+    def close(self) -> None:
+        self.target.removeEventListener(self.event_type, self.proxy)
+        destroy_proxy(self.proxy)
+
+
+# Listeners for these never call preventDefault, so the browser need not wait.
+PASSIVE_EVENTS = frozenset(["scroll", "wheel", "touchstart", "touchmove"])
+
+_listeners: dict[tuple[int, str, str], _Listener] = {}
+
+
+def listener_count(target: str = "document") -> int:
+    """Number of native listeners installed on `target` by subscriptions."""
+    backend = get_backend()
+    return sum(
+        1 for (b, t, _), _ in _listeners.items() if b == id(backend) and t == target
+    )
+
+
+def listen(target: str, event_type: str, callback: Callback) -> UnSubscription:
+    """Call `callback` for each `event_type` event on the document or window.
+
+    Callbacks share a single native listener per target and event type, which
+    is removed once the last of them unsubscribes.
+    """
+    backend = get_backend()
+    key = (id(backend), target, event_type)
+    if (listener := _listeners.get(key)) is None:
+        listener = _Listener(backend, getattr(backend, target), event_type)
+        _listeners[key] = listener
+    listener.callbacks.append(callback)
+
+    def _unsubscription() -> None:
+        listener.callbacks.remove(callback)
+        if not listener.callbacks and _listeners.get(key) is listener:
+            del _listeners[key]
+            listener.close()
+
+    return _unsubscription
+
+
+def on(
+    event_type: str, handler: Handler[Msg], target: str = "document"
+) -> Subscription[Msg]:
+    """Subscribe to `event_type` events on the "document" or the "window"."""
+
+    @subscription(key=(target, event_type, handler))
+    def _subscription(dispatch: Dispatch[Msg]) -> UnSubscription:
+        return listen(target, event_type, lambda e: handle_event(handler, e, dispatch))
+
+    return _subscription
+
+
+def _create_subscriber(
+    event_type: str, target: str = "document"
+) -> Callable[[Handler[Msg]], Subscription[Msg]]:
+    def _subscriber(handler: Handler[Msg]) -> Subscription[Msg]:
+        return on(event_type, handler, target)
 
     return _subscriber
 
@@ -73,3 +277,74 @@ on_click = _create_subscriber("click")
 on_mousemove = _create_subscriber("mousemove")
 on_mousedown = _create_subscriber("mousedown")
 on_mouseup = _create_subscriber("mouseup")
+
+
+def on_resize(handler: Handler[Msg]) -> Subscription[Msg]:
+    """Window resizes, at most one message per animation frame."""
+    return on("resize", sample_frame(handler), target="window")
+
+
+def on_scroll(handler: Handler[Msg], target: str = "window") -> Subscription[Msg]:
+    """Scrolling through a passive listener, at most one message per frame."""
+    return on("scroll", sample_frame(handler), target=target)
+
+
+def on_wheel(handler: Handler[Msg], target: str = "window") -> Subscription[Msg]:
+    return on("wheel", sample_frame(handler), target=target)
+
+
+def on_visibility_change(handler: Handler[Msg]) -> Subscription[Msg]:
+    # not sampled: animation frames do not run while the page is hidden
+    return on("visibilitychange", handler)
+
+
+def on_animation_frame(handler: Callable[[float], Msg]) -> Subscription[Msg]:
+    """A message per animation frame with its timestamp, paused while the page
+    is hidden. Pass a handler defined outside the view to keep it subscribed."""
+
+    @subscription(key=("animationframe", handler))
+    def _subscription(dispatch: Dispatch[Msg]) -> UnSubscription:
+        window = get_backend().window
+        hidden = get_backend().document.hidden
+        frame: int | None = None
+        closed = False
+
+        def _on_frame(timestamp: float) -> None:
+            nonlocal frame
+            frame = None
+            # the dispatch may drop this subscription, destroying the proxy
+            dispatch(handler(timestamp))
+            _request()
+
+        def _request() -> None:
+            nonlocal frame
+            if frame is None and not hidden and not closed:
+                frame = window.requestAnimationFrame(proxy)
+
+        def _cancel() -> None:
+            nonlocal frame
+            if frame is not None:
+                window.cancelAnimationFrame(frame)
+                frame = None
+
+        def _on_visibility_change(_: Any) -> None:
+            nonlocal hidden
+            hidden = get_backend().document.hidden
+            if hidden:
+                _cancel()
+            else:
+                _request()
+
+        def _unsubscription() -> None:
+            nonlocal closed
+            closed = True
+            unlisten()
+            _cancel()
+            destroy_proxy(proxy)
+
+        proxy = create_proxy(_on_frame)
+        unlisten = listen("document", "visibilitychange", _on_visibility_change)
+        _request()
+        return _unsubscription
+
+    return _subscription
@@ -0,0 +1,952 @@
+"""An in-memory DOM implementing the subset of the browser API alfort_dom uses.
+
+It lets apps be rendered, patched, dispatched to and timed under plain
+CPython, e.g. in tests and benchmarks::
+
+    backend = use_backend(HeadlessBackend())
+    backend.document.body.appendChild(backend.document.createElement("div")).id = "root"
+    app.main(root="root")
+    backend.window.run_frame()
+"""
+import html
+from collections import Counter
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from itertools import count
+from typing import Any, Callable, Generator, Iterator, cast
+from urllib.parse import urlsplit
+
+from .backend import AsyncStore, Extractor
+from .backend import Node as BackendNode
+from .backend import PatchInterpreter
+from .css import to_css_name
+
+ELEMENT_NODE = 1
+TEXT_NODE = 3
+COMMENT_NODE = 8
+DOCUMENT_NODE = 9
+
+VOID_ELEMENTS = frozenset(
+    [
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "source",
+        "track",
+        "wbr",
+    ]
+)
+
+
+def _is_capture(options: Any) -> bool:
+    if isinstance(options, dict):
+        return bool(cast(dict[str, Any], options).get("capture", False))
+    return bool(options)
+
+
+def to_attribute_value(value: Any) -> str:
+    """Stringify `value` the way JS does when it is assigned to an attribute."""
+    match value:
+        case True:
+            return "true"
+        case False:
+            return "false"
+        case None:
+            return "null"
+        case float() if value.is_integer():
+            return str(int(value))
+        case _:
+            return str(value)
+
+
+class CallCounter:
+    """Counts the calls made from Python into the DOM, i.e. the calls which
+    would each be a round-trip over Pyodide's FFI in the browser."""
+
+    calls: Counter[str]
+
+    def __init__(self) -> None:
+        self.calls = Counter()
+        self._paused = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def count(self, name: str) -> None:
+        if not self._paused:
+            self.calls[name] += 1
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+    @contextmanager
+    def paused(self) -> Generator[None, None, None]:
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+
+class Event:
+    def __init__(
+        self,
+        type: str,
+        *,
+        bubbles: bool = True,
+        cancelable: bool = True,
+        **fields: Any,
+    ) -> None:
+        self.type = type
+        self.bubbles = bubbles
+        self.cancelable = cancelable
+        self.target: Any = None
+        self.currentTarget: Any = None
+        self.defaultPrevented = False
+        self.cancelBubble = False
+        for k, v in fields.items():
+            setattr(self, k, v)
+
+    def stopPropagation(self) -> None:
+        self.cancelBubble = True
+
+    def preventDefault(self) -> None:
+        if self.cancelable:
+            self.defaultPrevented = True
+
+
+class EventTarget:
+    _listeners: dict[str, list[tuple[Any, bool]]]
+    _passive: set[tuple[str, Any]]
+    ffi: CallCounter
+
+    def __init__(self, ffi: CallCounter | None = None) -> None:
+        self._listeners = {}
+        self._passive = set()
+        self.ffi = ffi if ffi is not None else CallCounter()
+
+    def addEventListener(
+        self, event_type: str, listener: Any, options: Any = False
+    ) -> None:
+        self.ffi.count("addEventListener")
+        entry = (listener, _is_capture(options))
+        listeners = self._listeners.setdefault(event_type, [])
+        if entry not in listeners:
+            listeners.append(entry)
+            if isinstance(options, dict) and cast(dict[str, Any], options).get(
+                "passive"
+            ):
+                self._passive.add((event_type, listener))
+
+    def removeEventListener(
+        self, event_type: str, listener: Any, options: Any = False
+    ) -> None:
+        self.ffi.count("removeEventListener")
+        entry = (listener, _is_capture(options))
+        listeners = self._listeners.get(event_type, [])
+        if entry in listeners:
+            listeners.remove(entry)
+            self._passive.discard((event_type, listener))
+
+    def listener_count(self, event_type: str | None = None) -> int:
+        if event_type is not None:
+            return len(self._listeners.get(event_type, []))
+        return sum(len(ls) for ls in self._listeners.values())
+
+    def passive_count(self, event_type: str) -> int:
+        return sum(t == event_type for t, _ in self._passive)
+
+    def _event_parent(self) -> "EventTarget | None":
+        return None
+
+    def _invoke(self, event: Event, capture: bool | None) -> None:
+        event.currentTarget = self
+        for listener, is_capture in list(self._listeners.get(event.type, [])):
+            if capture is None or is_capture == capture:
+                listener(event)
+
+    def dispatchEvent(self, event: Event) -> bool:
+        event.target = self
+        ancestors: list[EventTarget] = []
+        parent = self._event_parent()
+        while parent is not None:
+            ancestors.append(parent)
+            parent = parent._event_parent()
+
+        phases: list[tuple[EventTarget, bool | None]] = [
+            *((t, True) for t in reversed(ancestors)),
+            (self, None),
+        ]
+        if event.bubbles:
+            phases.extend((t, False) for t in ancestors)
+
+        for target, capture in phases:
+            target._invoke(event, capture)
+            if event.cancelBubble:
+                break
+        event.currentTarget = None
+        return not event.defaultPrevented
+
+
+def _node(node: BackendNode) -> "Node":
+    if not isinstance(node, Node):
+        raise TypeError(f"Not a node of this document: {node!r}")
+    return node
+
+
+class Node(EventTarget):
+    nodeType: int
+    parentNode: "Node | None"
+    childNodes: list["Node"]
+    ownerDocument: "Document | None"
+
+    def __init__(self, owner: "Document | None") -> None:
+        super().__init__(owner.ffi if owner is not None else None)
+        self.parentNode = None
+        self.childNodes = []
+        self.ownerDocument = owner
+
+    def _event_parent(self) -> EventTarget | None:
+        return self.parentNode
+
+    @property
+    def nodeValue(self) -> str | None:
+        return None
+
+    @nodeValue.setter
+    def nodeValue(self, text: str) -> None:
+        pass
+
+    @property
+    def firstChild(self) -> "Node | None":
+        return self.childNodes[0] if self.childNodes else None
+
+    @property
+    def lastChild(self) -> "Node | None":
+        return self.childNodes[-1] if self.childNodes else None
+
+    @property
+    def nextSibling(self) -> "Node | None":
+        if self.parentNode is None:
+            return None
+        siblings = self.parentNode.childNodes
+        i = siblings.index(self) + 1
+        return siblings[i] if i < len(siblings) else None
+
+    @property
+    def textContent(self) -> str:
+        return "".join(
+            c.textContent for c in self.childNodes if c.nodeType != COMMENT_NODE
+        )
+
+    def insertBefore(
+        self, child: BackendNode, reference: BackendNode | None = None
+    ) -> "Node":
+        self.ffi.count("insertBefore")
+        return self._insert(
+            _node(child), None if reference is None else _node(reference)
+        )
+
+    def appendChild(self, child: BackendNode) -> "Node":
+        self.ffi.count("appendChild")
+        return self._insert(_node(child), None)
+
+    def removeChild(self, child: BackendNode) -> "Node":
+        self.ffi.count("removeChild")
+        return self._remove(_node(child))
+
+    def _insert(self, child: "Node", reference: "Node | None") -> "Node":
+        if child.parentNode is not None:
+            child.parentNode._remove(child)
+        if reference is None:
+            self.childNodes.append(child)
+        else:
+            self.childNodes.insert(self._index_of(reference), child)
+        child.parentNode = self
+        return child
+
+    def _remove(self, child: "Node") -> "Node":
+        self.childNodes.pop(self._index_of(child))
+        child.parentNode = None
+        return child
+
+    def _index_of(self, child: "Node") -> int:
+        for i, c in enumerate(self.childNodes):
+            if c is child:
+                return i
+        raise ValueError("NotFoundError: the node is not a child of this node")
+
+    def cloneNode(self, deep: bool = False) -> "Node":
+        self.ffi.count("cloneNode")
+        return self._clone(deep)
+
+    def _clone(self, deep: bool) -> "Node":
+        clone = self._clone_node()
+        if deep:
+            for c in self.childNodes:
+                clone._insert(c._clone(True), None)
+        return clone
+
+    def _clone_node(self) -> "Node":
+        return Node(self.ownerDocument)
+
+    def iter_descendants(self) -> Iterator["Node"]:
+        for c in self.childNodes:
+            yield c
+            yield from c.iter_descendants()
+
+    @property
+    def outerHTML(self) -> str:
+        return self.innerHTML
+
+    @property
+    def innerHTML(self) -> str:
+        return "".join(c.outerHTML for c in self.childNodes)
+
+    @innerHTML.setter
+    def innerHTML(self, markup: str) -> None:
+        self.ffi.count("innerHTML")
+        for c in list(self.childNodes):
+            self._remove(c)
+        with self.ffi.paused():
+            _FragmentParser(self).feed(markup)
+
+
+class CharacterData(Node):
+    data: str
+
+    def __init__(self, data: str, owner: "Document | None") -> None:
+        super().__init__(owner)
+        self.data = data
+
+    @property
+    def nodeValue(self) -> str | None:
+        return self.data
+
+    @nodeValue.setter
+    def nodeValue(self, text: str) -> None:
+        self.ffi.count("nodeValue")
+        self.data = str(text)
+
+    @property
+    def textContent(self) -> str:
+        return self.data
+
+
+class Text(CharacterData):
+    nodeType = TEXT_NODE
+
+    def _clone_node(self) -> "Text":
+        return Text(self.data, self.ownerDocument)
+
+    @property
+    def outerHTML(self) -> str:
+        return html.escape(self.data, quote=False)
+
+
+class Comment(CharacterData):
+    nodeType = COMMENT_NODE
+
+    def _clone_node(self) -> "Comment":
+        return Comment(self.data, self.ownerDocument)
+
+    @property
+    def outerHTML(self) -> str:
+        return f"<!--{self.data}-->"
+
+
+class Style:
+    """CSSStyleDeclaration supporting both `style.marginTop = ...` and
+    `style.setProperty("margin-top", ...)`."""
+
+    _properties: dict[str, str]
+    _ffi: CallCounter
+
+    def __init__(self, ffi: CallCounter | None = None) -> None:
+        object.__setattr__(self, "_properties", {})
+        object.__setattr__(self, "_ffi", ffi if ffi is not None else CallCounter())
+
+    def setProperty(self, name: str, value: Any) -> None:
+        self._ffi.count("style.setProperty")
+        self._set(name, value)
+
+    def removeProperty(self, name: str) -> str:
+        self._ffi.count("style.removeProperty")
+        return self._properties.pop(to_css_name(name), "")
+
+    def _set(self, name: str, value: Any) -> None:
+        if value is None or value == "":
+            self._properties.pop(to_css_name(name), None)
+        else:
+            self._properties[to_css_name(name)] = str(value)
+
+    def getPropertyValue(self, name: str) -> str:
+        return self._properties.get(to_css_name(name), "")
+
+    @property
+    def length(self) -> int:
+        return len(self._properties)
+
+    @property
+    def cssText(self) -> str:
+        return " ".join(f"{k}: {v};" for k, v in self._properties.items())
+
+    @cssText.setter
+    def cssText(self, text: str) -> None:
+        self._ffi.count("style.cssText")
+        self.parse_css_text(text)
+
+    def parse_css_text(self, text: str) -> None:
+        """Set `cssText` on the Python side, i.e. without counting a call."""
+        self._properties.clear()
+        for declaration in text.split(";"):
+            name, sep, value = declaration.partition(":")
+            if sep and name.strip():
+                self._set(name.strip(), value.strip())
+
+    def copy_from(self, other: "Style") -> None:
+        self._properties.update(other._properties)
+
+    def __getattr__(self, name: str) -> str:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.getPropertyValue(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "cssText":
+            object.__setattr__(self, name, value)
+        else:
+            self._ffi.count("style.set")
+            self._set(name, value)
+
+
+class _Reflected:
+    """An IDL property mirroring a content attribute."""
+
+    def __init__(self, attribute: str, boolean: bool = False) -> None:
+        self.attribute = attribute
+        self.boolean = boolean
+
+    def __get__(self, obj: "Element | None", objtype: Any = None) -> Any:
+        if obj is None:
+            return self
+        obj.ffi.count("get")
+        value = obj.attributes.get(self.attribute)
+        if self.boolean:
+            return value is not None
+        return "" if value is None else value
+
+    def __set__(self, obj: "Element", value: Any) -> None:
+        obj.ffi.count("set")
+        if not self.boolean:
+            obj.attributes[self.attribute] = to_attribute_value(value)
+        elif value:
+            obj.attributes[self.attribute] = ""
+        else:
+            obj.attributes.pop(self.attribute, None)
+
+
+class _State:
+    """An IDL property holding live state, e.g. `value` or `checked`."""
+
+    def __init__(self, name: str, default: Any) -> None:
+        self.name = name
+        self.default = default
+
+    def __get__(self, obj: "Element | None", objtype: Any = None) -> Any:
+        if obj is None:
+            return self
+        obj.ffi.count("get")
+        return obj.state.get(self.name, self.default)
+
+    def __set__(self, obj: "Element", value: Any) -> None:
+        obj.ffi.count("set")
+        obj.state[self.name] = value
+
+
+class Element(Node):
+    nodeType = ELEMENT_NODE
+    tagName: str
+    localName: str
+    attributes: dict[str, str]
+    state: dict[str, Any]
+    style: Style
+
+    id = _Reflected("id")
+    className = _Reflected("class")
+    title = _Reflected("title")
+    type = _Reflected("type")
+    name = _Reflected("name")
+    placeholder = _Reflected("placeholder")
+    href = _Reflected("href")
+    src = _Reflected("src")
+    htmlFor = _Reflected("for")
+    hidden = _Reflected("hidden", boolean=True)
+    disabled = _Reflected("disabled", boolean=True)
+    autofocus = _Reflected("autofocus", boolean=True)
+    value = _State("value", "")
+    checked = _State("checked", False)
+    selected = _State("selected", False)
+    scrollTop = _State("scrollTop", 0)
+
+    def __init__(self, tag: str, owner: "Document | None") -> None:
+        super().__init__(owner)
+        self.localName = tag.lower()
+        self.tagName = tag.upper()
+        self.attributes = {}
+        self.state = {}
+        self.style = Style(self.ffi)
+
+    def __getattr__(self, name: str) -> Any:
+        # only reached for names the element does not have, e.g. hasattr() probes
+        if not name.startswith("_"):
+            self.ffi.count("get")
+        raise AttributeError(name)
+
+    def getAttribute(self, name: str) -> str | None:
+        self.ffi.count("getAttribute")
+        if name == "style":
+            return self.style.cssText or None
+        return self.attributes.get(name)
+
+    def getAttributeNames(self) -> list[str]:
+        self.ffi.count("getAttributeNames")
+        return [*self.attributes, *(["style"] if self.style.length else [])]
+
+    def hasAttribute(self, name: str) -> bool:
+        self.ffi.count("hasAttribute")
+        return name in self.attributes or (name == "style" and bool(self.style.length))
+
+    def setAttribute(self, name: str, value: Any) -> None:
+        self.ffi.count("setAttribute")
+        self._set_attribute(name, value)
+
+    def removeAttribute(self, name: str) -> None:
+        self.ffi.count("removeAttribute")
+        self._remove_attribute(name)
+
+    def _set_attribute(self, name: str, value: Any) -> None:
+        if name == "style":
+            self.style.parse_css_text(to_attribute_value(value))
+        else:
+            self.attributes[name] = to_attribute_value(value)
+
+    def _remove_attribute(self, name: str) -> None:
+        if name == "style":
+            self.style.parse_css_text("")
+        else:
+            self.attributes.pop(name, None)
+
+    def focus(self) -> None:
+        self.ffi.count("focus")
+        if self.ownerDocument is not None:
+            self.ownerDocument.activeElement = self
+
+    def _clone_node(self) -> "Element":
+        clone = Element(self.localName, self.ownerDocument)
+        clone.attributes = dict(self.attributes)
+        clone.style.copy_from(self.style)
+        return clone
+
+    def getElementById(self, id: str) -> "Element | None":
+        for node in self.iter_descendants():
+            if isinstance(node, Element) and node.attributes.get("id") == id:
+                return node
+        return None
+
+    @property
+    def children(self) -> list["Element"]:
+        return [c for c in self.childNodes if isinstance(c, Element)]
+
+    @property
+    def outerHTML(self) -> str:
+        attrs = "".join(
+            f' {k}="{html.escape(v)}"'
+            for k, v in [*self.attributes.items(), ("style", self.style.cssText)]
+            if k != "style" or v
+        )
+        if self.localName in VOID_ELEMENTS:
+            return f"<{self.localName}{attrs}>"
+        return f"<{self.localName}{attrs}>{self.innerHTML}</{self.localName}>"
+
+
+class _FragmentParser(HTMLParser):
+    def __init__(self, parent: Node) -> None:
+        super().__init__(convert_charrefs=True)
+        self._owner = parent.ownerDocument
+        self._stack = [parent]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        element = Element(tag, self._owner)
+        for k, v in attrs:
+            element.setAttribute(k, "" if v is None else v)
+        self._stack[-1].appendChild(element)
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        for i in range(len(self._stack) - 1, 0, -1):
+            node = self._stack[i]
+            if isinstance(node, Element) and node.localName == tag:
+                del self._stack[i:]
+                break
+
+    def handle_data(self, data: str) -> None:
+        self._stack[-1].appendChild(Text(data, self._owner))
+
+    def handle_comment(self, data: str) -> None:
+        self._stack[-1].appendChild(Comment(data, self._owner))
+
+
+class Document(Node):
+    nodeType = DOCUMENT_NODE
+    documentElement: Element
+    body: Element
+    activeElement: Element | None
+    defaultView: "Window | None"
+    visibilityState: str
+
+    def __init__(self, window: "Window | None" = None) -> None:
+        super().__init__(None)
+        self.ffi = window.ffi if window is not None else CallCounter()
+        self.defaultView = window
+        self.visibilityState = "visible"
+        self.documentElement = Element("html", self)
+        self._insert(self.documentElement, None)
+        self.body = Element("body", self)
+        self.documentElement._insert(self.body, None)
+        self.activeElement = self.body
+
+    def _event_parent(self) -> EventTarget | None:
+        return self.defaultView
+
+    @property
+    def hidden(self) -> bool:
+        return self.visibilityState == "hidden"
+
+    def createElement(self, tag: str, options: Any = None) -> Element:
+        self.ffi.count("createElement")
+        return Element(tag, self)
+
+    def createTextNode(self, text: str) -> Text:
+        self.ffi.count("createTextNode")
+        return Text(text, self)
+
+    def createComment(self, text: str) -> Comment:
+        self.ffi.count("createComment")
+        return Comment(text, self)
+
+    def getElementById(self, id: str) -> Element | None:
+        self.ffi.count("getElementById")
+        return self.documentElement.getElementById(id)
+
+    @property
+    def outerHTML(self) -> str:
+        return self.documentElement.outerHTML
+
+
+class Storage:
+    _items: dict[str, str]
+    ffi: CallCounter
+
+    def __init__(self, ffi: CallCounter | None = None) -> None:
+        self._items = {}
+        self.ffi = ffi if ffi is not None else CallCounter()
+
+    @property
+    def length(self) -> int:
+        self.ffi.count("storage.length")
+        return len(self._items)
+
+    def key(self, index: int) -> str | None:
+        self.ffi.count("storage.key")
+        keys = list(self._items)
+        return keys[index] if 0 <= index < len(keys) else None
+
+    def getItem(self, key: str) -> str | None:
+        self.ffi.count("storage.getItem")
+        return self._items.get(key)
+
+    def setItem(self, key: str, value: Any) -> None:
+        self.ffi.count("storage.setItem")
+        self._items[key] = to_attribute_value(value)
+
+    def removeItem(self, key: str) -> None:
+        self.ffi.count("storage.removeItem")
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self.ffi.count("storage.clear")
+        self._items.clear()
+
+    def object_keys(self) -> list[str]:
+        self.ffi.count("storage.object_keys")
+        return list(self._items)
+
+    def snapshot(self) -> dict[str, str]:
+        """A copy of all the items, read on the Python side."""
+        return dict(self._items)
+
+
+class Location:
+    href: str
+    reload_count: int
+
+    def __init__(self, href: str) -> None:
+        self.href = href
+        self.reload_count = 0
+
+    def _part(self, name: str) -> str:
+        return getattr(urlsplit(self.href), name) or ""
+
+    @property
+    def protocol(self) -> str:
+        return self._part("scheme") + ":"
+
+    @property
+    def host(self) -> str:
+        return self._part("netloc")
+
+    @property
+    def hostname(self) -> str:
+        return self._part("hostname")
+
+    @property
+    def port(self) -> str:
+        port = urlsplit(self.href).port
+        return "" if port is None else str(port)
+
+    @property
+    def pathname(self) -> str:
+        return self._part("path") or "/"
+
+    @property
+    def search(self) -> str:
+        query = self._part("query")
+        return f"?{query}" if query else ""
+
+    @property
+    def hash(self) -> str:
+        fragment = self._part("fragment")
+        return f"#{fragment}" if fragment else ""
+
+    @hash.setter
+    def hash(self, value: str) -> None:
+        base = self.href.split("#", 1)[0]
+        self.href = f"{base}#{value.lstrip('#')}" if value else base
+
+    @property
+    def origin(self) -> str:
+        return f"{self.protocol}//{self.host}"
+
+    def assign(self, url: str) -> None:
+        self.href = url
+
+    def replace(self, url: str) -> None:
+        self.href = url
+
+    def reload(self) -> None:
+        self.reload_count += 1
+
+
+class Performance:
+    def __init__(self, window: "Window") -> None:
+        self._window = window
+
+    def now(self) -> float:
+        self._window.ffi.count("performance.now")
+        return self._window.now
+
+
+class Window(EventTarget):
+    """Window with a virtual clock driving animation frames and timers."""
+
+    ffi: CallCounter
+    document: Document
+    localStorage: Storage
+    location: Location
+    performance: Performance
+    innerWidth: int
+    innerHeight: int
+    scrollX: float
+    scrollY: float
+    now: float
+
+    def __init__(self, href: str = "http://localhost/") -> None:
+        self.ffi = CallCounter()
+        super().__init__(self.ffi)
+        self.document = Document(self)
+        self.localStorage = Storage(self.ffi)
+        self.location = Location(href)
+        self.performance = Performance(self)
+        self.innerWidth = 1024
+        self.innerHeight = 768
+        self.scrollX = 0.0
+        self.scrollY = 0.0
+        self.now = 0.0
+        self._ids = count(1)
+        self._frames: dict[int, Callable[[float], Any]] = {}
+        self._timers: dict[int, tuple[float, Callable[..., Any], tuple[Any, ...]]] = {}
+
+    def requestAnimationFrame(self, callback: Callable[[float], Any]) -> int:
+        self.ffi.count("requestAnimationFrame")
+        handle = next(self._ids)
+        self._frames[handle] = callback
+        return handle
+
+    def cancelAnimationFrame(self, handle: int) -> None:
+        self.ffi.count("cancelAnimationFrame")
+        self._frames.pop(handle, None)
+
+    def setTimeout(
+        self, callback: Callable[..., Any], delay: float = 0, *args: Any
+    ) -> int:
+        self.ffi.count("setTimeout")
+        handle = next(self._ids)
+        self._timers[handle] = (self.now + max(delay, 0), callback, args)
+        return handle
+
+    def clearTimeout(self, handle: int) -> None:
+        self.ffi.count("clearTimeout")
+        self._timers.pop(handle, None)
+
+    @property
+    def pending_frames(self) -> int:
+        return len(self._frames)
+
+    def run_frame(self, elapsed: float = 1000 / 60) -> int:
+        """Advance the clock by one frame and run the callbacks requested
+        before it; returns how many callbacks ran."""
+        self.advance(elapsed)
+        frames = self._frames
+        self._frames = {}
+        for callback in frames.values():
+            callback(self.now)
+        return len(frames)
+
+    def advance(self, ms: float) -> None:
+        """Move the virtual clock forward, firing the timers that are due."""
+        deadline = self.now + ms
+        while True:
+            due = [
+                (at, handle)
+                for handle, (at, _, _) in self._timers.items()
+                if at <= deadline
+            ]
+            if not due:
+                break
+            at, handle = min(due)
+            _, callback, args = self._timers.pop(handle)
+            self.now = max(self.now, at)
+            callback(*args)
+        self.now = deadline
+
+
+class Proxy:
+    """Stand-in for a Pyodide JsProxy wrapping a Python callable."""
+
+    def __init__(self, obj: Any, once: bool = False) -> None:
+        self.obj = obj
+        self.once = once
+        self.destroyed = False
+
+    def __call__(self, *args: Any) -> Any:
+        if self.destroyed:
+            raise RuntimeError("This proxy has already been destroyed")
+        if self.once:
+            self.destroyed = True
+        return self.obj(*args)
+
+    def destroy(self) -> None:
+        if self.destroyed:
+            raise RuntimeError("Object has already been destroyed")
+        self.destroyed = True
+
+
+class HeadlessBackend:
+    window: Window
+
+    def __init__(self, href: str = "http://localhost/") -> None:
+        self.window = Window(href)
+        self._stores: dict[str, AsyncStore] = {}
+
+    @property
+    def document(self) -> Document:
+        return self.window.document
+
+    @property
+    def local_storage(self) -> Storage:
+        return self.window.localStorage
+
+    @property
+    def location(self) -> Location:
+        return self.window.location
+
+    @property
+    def ffi(self) -> CallCounter:
+        return self.window.ffi
+
+    def create_proxy(self, obj: Any) -> Proxy:
+        self.ffi.count("create_proxy")
+        return Proxy(obj)
+
+    def create_once_callable(self, fun: Callable[..., Any]) -> Proxy:
+        self.ffi.count("create_once_callable")
+        return Proxy(fun, once=True)
+
+    def destroy_proxy(self, proxy: Any) -> None:
+        self.ffi.count("destroy")
+        proxy.destroy()
+
+    def to_js(self, obj: Any) -> Any:
+        self.ffi.count("to_js")
+        return obj
+
+    def patch_interpreter(self) -> PatchInterpreter:
+        from .batch import replay
+
+        def _interpreter(nodes: list[Any], ops: list[Any]) -> None:
+            # the whole buffer is replayed by a single call into JS
+            self.ffi.count("patch_interpreter")
+            with self.ffi.paused():
+                replay(nodes, ops)
+
+        return _interpreter
+
+    def open_store(self, name: str) -> AsyncStore:
+        from .indexed_db import MemoryStore
+
+        if (store := self._stores.get(name)) is None:
+            store = self._stores[name] = MemoryStore()
+        return store
+
+    def storage_snapshot(self) -> dict[str, str]:
+        self.ffi.count("storage.snapshot")
+        return self.local_storage.snapshot()
+
+    def storage_write(self, changes: dict[str, str | None]) -> None:
+        self.ffi.count("storage.write")
+        with self.ffi.paused():
+            for key, value in changes.items():
+                if value is None:
+                    self.local_storage.removeItem(key)
+                else:
+                    self.local_storage.setItem(key, value)
+
+    def compile_extractor(self, paths: tuple[str, ...]) -> Extractor:
+        from .decode import extract
+
+        def _extractor(event: Any) -> list[Any]:
+            self.ffi.count("extract")
+            with self.ffi.paused():
+                return [extract(event, p) for p in paths]
+
+        return _extractor
@@ -0,0 +1,203 @@
+"""Asynchronous key-value storage backed by IndexedDB.
+
+Unlike `local_storage`, values may be any structured-cloneable value, e.g.
+dicts, lists and bytes, and reads and writes never block rendering. The
+`save`, `load` and `remove` effects run them from `update`::
+
+    return (model, [save(open_store(), "model", asdict(model))])
+"""
+import asyncio
+import copy
+from typing import Any, Callable, TypeVar
+
+from alfort import Dispatch, Effect
+
+from .backend import AsyncStore, get_backend
+from .proxy import create_proxy, destroy_proxy
+
+M = TypeVar("M")
+
+
+class StorageError(Exception):
+    pass
+
+
+class MemoryStore:
+    """In-memory AsyncStore, standing in for IndexedDB outside the browser.
+
+    Values are deep-copied on the way in and out, as structured cloning does.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[str, Any] = {}
+
+    async def get(self, key: str) -> Any | None:
+        await asyncio.sleep(0)
+        return copy.deepcopy(self._items.get(key))
+
+    async def put(self, key: str, value: Any) -> None:
+        await asyncio.sleep(0)
+        self._items[key] = copy.deepcopy(value)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.sleep(0)
+        self._items.pop(key, None)
+
+    async def keys(self) -> list[str]:
+        await asyncio.sleep(0)
+        return sorted(self._items)
+
+    async def items(self) -> list[tuple[str, Any]]:
+        await asyncio.sleep(0)
+        return [(k, copy.deepcopy(self._items[k])) for k in sorted(self._items)]
+
+
+def _to_py(value: Any) -> Any:
+    if hasattr(value, "to_py"):
+        value = value.to_py()
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return value
+
+
+async def _wait(request: Any) -> Any:
+    future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+
+    def _on_success(_: Any) -> None:
+        if not future.done():
+            future.set_result(request.result)
+
+    def _on_error(_: Any) -> None:
+        if not future.done():
+            future.set_exception(StorageError(str(request.error)))
+
+    on_success = create_proxy(_on_success)
+    on_error = create_proxy(_on_error)
+    request.onsuccess = on_success
+    request.onerror = on_error
+    try:
+        return await future
+    finally:
+        destroy_proxy(on_success)
+        destroy_proxy(on_error)
+
+
+class IndexedDBStore:
+    """AsyncStore over one object store of an IndexedDB database."""
+
+    def __init__(self, name: str, store: str = "items") -> None:
+        self.name = name
+        self.store = store
+        self._db: asyncio.Task[Any] | None = None
+
+    async def _open(self) -> Any:
+        import js
+
+        request = js.indexedDB.open(self.name, 1)
+        store = self.store
+
+        def _on_upgrade(_: Any) -> None:
+            request.result.createObjectStore(store)
+
+        on_upgrade = create_proxy(_on_upgrade)
+        request.onupgradeneeded = on_upgrade
+        try:
+            return await _wait(request)
+        finally:
+            destroy_proxy(on_upgrade)
+
+    async def _object_store(self, mode: str) -> Any:
+        # Calls made while the database opens share the pending open.
+        if self._db is None:
+            self._db = asyncio.get_running_loop().create_task(self._open())
+        opening = self._db
+        try:
+            db = await opening
+        except StorageError:
+            if self._db is opening:
+                self._db = None
+            raise
+        return db.transaction(self.store, mode).objectStore(self.store)
+
+    async def get(self, key: str) -> Any | None:
+        return _to_py(await _wait((await self._object_store("readonly")).get(key)))
+
+    async def put(self, key: str, value: Any) -> None:
+        store = await self._object_store("readwrite")
+        await _wait(store.put(get_backend().to_js(value), key))
+
+    async def delete(self, key: str) -> None:
+        await _wait((await self._object_store("readwrite")).delete(key))
+
+    async def keys(self) -> list[str]:
+        return _to_py(await _wait((await self._object_store("readonly")).getAllKeys()))
+
+    async def items(self) -> list[tuple[str, Any]]:
+        store = await self._object_store("readonly")
+        (keys, values) = (store.getAllKeys(), store.getAll())
+        return list(zip(_to_py(await _wait(keys)), _to_py(await _wait(values))))
+
+
+def open_store(name: str = "alfort") -> AsyncStore:
+    """The store called `name` of the active backend."""
+    return get_backend().open_store(name)
+
+
+def save(
+    store: AsyncStore,
+    key: str,
+    value: Any,
+    on_saved: Callable[[], M] | None = None,
+    on_error: Callable[[Exception], M] | None = None,
+) -> Effect[M]:
+    async def _save(dispatch: Dispatch[M]) -> None:
+        try:
+            await store.put(key, value)
+        except StorageError as e:
+            if on_error is None:
+                raise
+            dispatch(on_error(e))
+            return
+        if on_saved is not None:
+            dispatch(on_saved())
+
+    return _save
+
+
+def load(
+    store: AsyncStore,
+    key: str,
+    to_msg: Callable[[Any | None], M],
+    on_error: Callable[[Exception], M] | None = None,
+) -> Effect[M]:
+    async def _load(dispatch: Dispatch[M]) -> None:
+        try:
+            value = await store.get(key)
+        except StorageError as e:
+            if on_error is None:
+                raise
+            dispatch(on_error(e))
+            return
+        dispatch(to_msg(value))
+
+    return _load
+
+
+def remove(
+    store: AsyncStore,
+    key: str,
+    on_removed: Callable[[], M] | None = None,
+    on_error: Callable[[Exception], M] | None = None,
+) -> Effect[M]:
+    async def _remove(dispatch: Dispatch[M]) -> None:
+        try:
+            await store.delete(key)
+        except StorageError as e:
+            if on_error is None:
+                raise
+            dispatch(on_error(e))
+            return
+        if on_removed is not None:
+            dispatch(on_removed())
+
+    return _remove
@@ -0,0 +1,78 @@
+"""Keyed children are matched by their `key` prop rather than by position.
+
+    el("ul", {}, [el("li", {"key": e.id}, [e.description]) for e in entries])
+
+Removing, inserting or moving a keyed child then touches that child only,
+and the DOM node of a moved child is moved rather than rebuilt. Keys only
+need to be unique among siblings; they are never set on the DOM.
+"""
+from bisect import bisect_left
+from typing import Any, Hashable, Sequence
+
+from alfort.app import NodeDom, NodeDomElement
+from alfort.vdom import VDom, VDomElement
+
+KEY_PROP = "key"
+
+
+class _Unkeyed:
+    """Key of the n-th child without a `key` prop, which unkeyed children
+    are matched by."""
+
+    __slots__ = ["index"]
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Unkeyed) and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((_Unkeyed, self.index))
+
+
+def keys_of(children: Sequence[VDom] | Sequence[NodeDom]) -> list[Hashable]:
+    keys: list[Hashable] = []
+    unkeyed = 0
+    for child in children:
+        key = None
+        if isinstance(child, VDomElement | NodeDomElement):
+            key = child.props.get(KEY_PROP)
+        if key is None:
+            key = _Unkeyed(unkeyed)
+            unkeyed += 1
+        keys.append(key)
+    return keys
+
+
+def has_keys(vdoms: Sequence[VDom]) -> bool:
+    return any(
+        isinstance(v, VDomElement) and v.props.get(KEY_PROP) is not None for v in vdoms
+    )
+
+
+def longest_increasing_subsequence(sources: Sequence[int]) -> set[int]:
+    """Positions in `sources` of a longest increasing run of its non-negative
+    values; negative values mark new children and are skipped."""
+    tails: list[int] = []  # tails[k] is the position ending a run of k + 1
+    values: list[int] = []  # values[k] is sources[tails[k]]
+    previous = [-1] * len(sources)
+    for i, source in enumerate(sources):
+        if source < 0:
+            continue
+        k = bisect_left(values, source)
+        if k > 0:
+            previous[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            values.append(source)
+        else:
+            tails[k] = i
+            values[k] = source
+
+    result: set[int] = set()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        result.add(i)
+        i = previous[i]
+    return result
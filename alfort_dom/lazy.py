@@ -0,0 +1,54 @@
+"""Lazy nodes skip the view and the diff of subtrees whose inputs are unchanged.
+
+    el("ul", {}, [lazy(view_entry, entry) for entry in model.entries])
+
+`view_entry(entry)` is only called, and its result only diffed, when `entry`
+is neither identical nor equal to the one of the previous render. `fn` has to
+be the same object across renders, so pass a module-level function rather
+than a lambda or a closure defined inside the view.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Hashable
+
+from alfort.app import NodeDomElement
+from alfort.vdom import VDom, VDomElement
+
+LAZY_TAG = "__lazy__"
+
+
+@dataclass(frozen=True)
+class Lazy(VDomElement):
+    fn: Callable[..., VDom]
+    args: tuple[Any, ...]
+
+    @cached_property
+    def vdom(self) -> VDom:
+        return self.fn(*self.args)
+
+    def same_as(self, other: "Lazy") -> bool:
+        return (
+            self.fn == other.fn
+            and len(self.args) == len(other.args)
+            and all(a is b or a == b for a, b in zip(self.args, other.args))
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class LazyNodeDom(NodeDomElement):
+    """The node of a lazy subtree, whose only child is the rendered subtree."""
+
+    lazy: Lazy
+
+
+def lazy(fn: Callable[..., VDom], *args: Any, key: Hashable | None = None) -> Lazy:
+    """`key` identifies the node among keyed siblings, see `alfort_dom.keyed`."""
+    props = {} if key is None else {"key": key}
+    return Lazy(LAZY_TAG, props, [], fn, args)
+
+
+def force(vdom: VDom) -> VDom:
+    """The vdom a (possibly nested) lazy node renders to."""
+    while isinstance(vdom, Lazy):
+        vdom = vdom.vdom
+    return vdom
@@ -1,29 +1,247 @@
-from collections.abc import MutableMapping
-from typing import Iterator
+from collections.abc import ItemsView, Iterable, Mapping, MutableMapping
+from dataclasses import dataclass
+from typing import Any, Iterator
 
-from js import localStorage
+from alfort.sub import UnSubscription
+
+from .backend import Backend, Storage, get_backend
+from .event import listen
+from .proxy import create_once_callable
 
 _ignore_keys = ["0_commands", "0_interpreters"]
 
+# Bodies of the JS functions reading and writing many items in one call.
+SNAPSHOT_SOURCE = """
+const items = [];
+for (let i = 0; i < storage.length; i++) {
+  const key = storage.key(i);
+  items.push([key, storage.getItem(key)]);
+}
+return items;
+"""
+WRITE_SOURCE = """
+for (const [key, value] of items) {
+  if (value === null || value === undefined) {
+    storage.removeItem(key);
+  } else {
+    storage.setItem(key, value);
+  }
+}
+"""
+
+
+@dataclass
+class StorageStats:
+    """Writes made to the underlying storage; `bytes_written` counts the UTF-16
+    bytes of keys and values, as browsers do for the quota."""
+
+    flushes: int = 0
+    writes: int = 0
+    bytes_written: int = 0
+
 
 class LocalStorage(MutableMapping[str, str]):
+    """`window.localStorage` as a mapping.
+
+    Keys are indexed on the Python side and kept in sync with other tabs
+    through `storage` events, so `len()`, iteration and membership tests do
+    not call into JS. `items()` and `update()` read or write all the items in
+    a single call.
+
+    After `enable_cache()`, reads are served from a Python-side mirror and
+    writes are buffered, then flushed at most once per `flush_ms` and whenever
+    the page is hidden or unloaded.
+    """
+
+    stats: StorageStats
+    _flush_ms: float | None
+    _index: dict[str, None] | None
+    _mirror: dict[str, str] | None
+    _dirty: dict[str, str | None]
+    _backend: Backend | None
+    _unsubscriptions: list[UnSubscription]
+
     def __init__(self) -> None:
-        self._storage = localStorage
+        self.stats = StorageStats()
+        self._flush_ms = None
+        self._index = None
+        self._mirror = None
+        self._dirty = {}
+        self._scheduled = False
+        self._backend = None
+        self._unsubscriptions = []
+
+    @property
+    def _storage(self) -> Storage:
+        return get_backend().local_storage
+
+    @property
+    def cached(self) -> bool:
+        return self._flush_ms is not None
+
+    def enable_cache(self, flush_ms: float = 200) -> None:
+        self._flush_ms = flush_ms
+
+    def disable_cache(self) -> None:
+        self.flush()
+        self._flush_ms = None
+        self._mirror = None
+
+    def _sync(self) -> Backend:
+        backend = get_backend()
+        if self._backend is not backend:
+            for unsubscribe in self._unsubscriptions:
+                unsubscribe()
+            self._unsubscriptions = [
+                listen("window", "storage", self._on_storage),
+                listen("window", "pagehide", self._on_hide),
+                listen("document", "visibilitychange", self._on_hide),
+            ]
+            self._index = None
+            self._mirror = None
+            self._dirty = {}
+            self._backend = backend
+        return backend
+
+    def _get_index(self) -> Mapping[str, object]:
+        backend = self._sync()
+        if self.cached:
+            return self._get_mirror()
+        if self._index is None:
+            self._index = dict.fromkeys(backend.local_storage.object_keys())
+        return self._index
+
+    def _get_mirror(self) -> dict[str, str]:
+        backend = self._sync()
+        if self._mirror is None:
+            self._mirror = backend.storage_snapshot()
+            self._mirror.update((k, v) for k, v in self._dirty.items() if v is not None)
+            for k in [k for k, v in self._dirty.items() if v is None]:
+                self._mirror.pop(k, None)
+            self._index = dict.fromkeys(self._mirror)
+        return self._mirror
+
+    def _on_storage(self, event: Any) -> None:
+        # another tab changed the storage; a null key means it was cleared
+        key: str | None = event.key
+        if key is None:
+            self._index = None
+            self._mirror = None
+            return
+        value: str | None = event.newValue
+        if self._index is not None:
+            if value is None:
+                self._index.pop(key, None)
+            else:
+                self._index[key] = None
+        if self._mirror is not None and key not in self._dirty:
+            if value is None:
+                self._mirror.pop(key, None)
+            else:
+                self._mirror[key] = value
+
+    def _on_hide(self, _: Any) -> None:
+        self.flush()
+
+    def _schedule(self) -> None:
+        if self._scheduled or self._flush_ms is None:
+            return
+        self._scheduled = True
+
+        def _flush(*_: Any) -> None:
+            self.flush()
+
+        get_backend().window.setTimeout(create_once_callable(_flush), self._flush_ms)
+
+    def _write(self, changes: dict[str, str | None]) -> None:
+        if len(changes) == 1:
+            ((key, value),) = changes.items()
+            if value is None:
+                self._storage.removeItem(key)
+            else:
+                self._storage.setItem(key, value)
+        else:
+            get_backend().storage_write(changes)
+
+        for key, value in changes.items():
+            if self._index is not None:
+                if value is None:
+                    self._index.pop(key, None)
+                else:
+                    self._index[key] = None
+            if value is not None:
+                self.stats.bytes_written += 2 * (len(key) + len(value))
+        self.stats.writes += len(changes)
+        self.stats.flushes += 1
+
+    def flush(self) -> None:
+        """Write the buffered changes to the storage."""
+        self._scheduled = False
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        self._write(dirty)
+
+    def _change(self, changes: dict[str, str | None]) -> None:
+        if not self.cached:
+            self._sync()
+            self._write(changes)
+            return
+
+        mirror = self._get_mirror()
+        for key, value in changes.items():
+            if mirror.get(key) == value:
+                continue
+            if value is None:
+                mirror.pop(key, None)
+            else:
+                mirror[key] = value
+            self._dirty[key] = value
+            self._schedule()
 
     def __getitem__(self, key: str) -> str:
+        if self.cached:
+            return self._get_mirror()[key]
         item = self._storage.getItem(key)
         if item is None:
             raise KeyError(key)
         return item
 
     def __setitem__(self, key: str, value: str) -> None:
-        self._storage.setItem(key, value)
+        self._change({key: value})
 
     def __delitem__(self, key: str) -> None:
-        self._storage.removeItem(key)
+        if key not in self:
+            raise KeyError(key)
+        self._change({key: None})
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._get_index()
 
     def __len__(self) -> int:
-        return self._storage.length
+        index = self._get_index()
+        return len(index) - sum(1 for k in _ignore_keys if k in index)
 
     def __iter__(self) -> Iterator[str]:
-        return iter(k for k in self._storage.object_keys() if k not in _ignore_keys)
+        return iter([k for k in self._get_index() if k not in _ignore_keys])
+
+    def items(self) -> ItemsView[str, str]:
+        """All the items, read with a single call unless cached."""
+        if self.cached:
+            items = self._get_mirror()
+        else:
+            items = self._sync().storage_snapshot()
+            self._index = dict.fromkeys(items)
+        return {k: v for k, v in items.items() if k not in _ignore_keys}.items()
+
+    def update(  # type: ignore
+        self,
+        other: Mapping[str, str] | Iterable[tuple[str, str]] = (),
+        /,
+        **kwargs: str,
+    ) -> None:
+        """Set many items with a single call."""
+        changes: dict[str, str | None] = dict(other)
+        changes.update(kwargs)
+        if changes:
+            self._change(changes)
@@ -1,6 +1,6 @@
 from typing import Any
 
-from js import location
+from .backend import get_backend
 
 
 class _Getter:
@@ -8,12 +8,12 @@ class _Getter:
         self.key = key
 
     def __get__(self, _obj: Any, _objtype: Any = None) -> str:
-        return str(getattr(location, self.key))
+        return str(getattr(get_backend().location, self.key))
 
 
 class _GetterAndSeter(_Getter):
     def __set__(self, _obj: Any, value: str) -> None:
-        setattr(location, self.key, value)
+        setattr(get_backend().location, self.key, value)
 
 
 class Location:
@@ -30,13 +30,13 @@ class Location:
     href = _GetterAndSeter("href")
 
     def assign(self, url: str) -> None:
-        location.assign(url)
+        get_backend().location.assign(url)
 
     def reload(self) -> None:
-        location.reload()
+        get_backend().location.reload()
 
     def replace(self, url: str) -> None:
-        location.replace(url)
+        get_backend().location.replace(url)
 
     def __str__(self) -> str:
         return self.href
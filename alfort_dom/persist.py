@@ -0,0 +1,170 @@
+"""Incremental persistence of frozen dataclass models into a string mapping.
+
+Every field is stored under its own key. A list field gets an index of item
+keys plus one key per item, so that a save writes only the slices whose
+objects changed since the previous save::
+
+    persister = Persister(Model, local_storage, "todos", keys={"entries": id_of})
+    persister.save(model)
+    model = persister.load()
+"""
+import dataclasses
+import json
+from collections.abc import MutableMapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, TypeVar, cast, get_args, get_type_hints
+
+T = TypeVar("T")
+
+
+@dataclass
+class PersistStats:
+    writes: int = 0
+    deletes: int = 0
+    bytes_written: int = 0
+
+
+def _encode(value: Any) -> str:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        value = dataclasses.asdict(value)
+    return json.dumps(value)
+
+
+def _converter(type_: Any) -> Callable[[Any], Any]:
+    if isinstance(type_, type) and dataclasses.is_dataclass(type_):
+        cls: Callable[..., Any] = type_
+        return lambda value: cls(**value)
+    return lambda value: value
+
+
+class Persister(Generic[T]):
+    """Saves a frozen dataclass model slice by slice.
+
+    Changes are found by identity: a field, list or item which is the very
+    object saved (or loaded) before is not written again. `keys` gives the
+    function naming the items of a list field, e.g. their id; items are keyed
+    by position otherwise.
+    """
+
+    stats: PersistStats
+    _saved: dict[str, Any] | None
+
+    def __init__(
+        self,
+        cls: type[T],
+        storage: MutableMapping[str, str],
+        prefix: str,
+        keys: dict[str, Callable[[Any], Any]] | None = None,
+    ) -> None:
+        self.cls = cls
+        self.storage = storage
+        self.prefix = prefix
+        self.keys = keys if keys is not None else {}
+        self.stats = PersistStats()
+        self._hints = get_type_hints(cls)
+        self._saved = None
+
+    def _key(self, *names: Any) -> str:
+        return ".".join([self.prefix, *map(str, names)])
+
+    def _is_list(self, name: str) -> bool:
+        return getattr(self._hints[name], "__origin__", None) in (list, tuple)
+
+    def _write(self, key: str, value: str) -> None:
+        self.storage[key] = value
+        self.stats.writes += 1
+        self.stats.bytes_written += len(value)
+
+    def _delete(self, key: str) -> None:
+        if key in self.storage:
+            del self.storage[key]
+            self.stats.deletes += 1
+
+    def _item_key(self, name: str, index: int, item: Any) -> str:
+        if (key := self.keys.get(name)) is not None:
+            return str(key(item))
+        return str(index)
+
+    def _save_list(
+        self, name: str, items: Sequence[Any], old: Sequence[Any] | None
+    ) -> None:
+        old_keys: list[str] = []
+        old_items: dict[str, Any] = {}
+        if old is not None:
+            old_keys = [self._item_key(name, i, v) for i, v in enumerate(old)]
+            old_items = dict(zip(old_keys, old))
+
+        keys = [self._item_key(name, i, v) for i, v in enumerate(items)]
+        for k, item in zip(keys, items):
+            if old_items.get(k) is not item:
+                self._write(self._key(name, k), _encode(item))
+        for k in set(old_keys) - set(keys):
+            self._delete(self._key(name, k))
+        if keys != old_keys or old is None:
+            self._write(self._key(name), json.dumps(keys))
+
+    def save(self, model: T) -> None:
+        saved = self._saved
+        if saved is None:
+            names = [f.name for f in dataclasses.fields(self.cls)]  # type: ignore
+            self._write(self.prefix, json.dumps(names))
+
+        fields: dict[str, Any] = {}
+        for f in dataclasses.fields(model):  # type: ignore
+            value = getattr(model, f.name)
+            fields[f.name] = value
+            old = None if saved is None else saved.get(f.name)
+            if saved is not None and old is value:
+                continue
+            if self._is_list(f.name):
+                self._save_list(f.name, value, old)
+            elif saved is None or old != value:
+                self._write(self._key(f.name), _encode(value))
+        self._saved = fields
+
+    def load(self) -> T | None:
+        """Rebuild the saved model, or return None when nothing is saved.
+
+        The loaded objects are remembered as saved, so that the next save
+        writes only what changed since the load. A model saved whole, as one
+        JSON object under the prefix, is loaded too; the next save migrates it
+        to one key per slice.
+        """
+        if self.prefix not in self.storage:
+            return None
+
+        names: list[str] = json.loads(self.storage[self.prefix])
+        whole: dict[str, Any] | None = None
+        if isinstance(names, dict):
+            # saved whole by an earlier version, as one JSON object
+            whole = cast(dict[str, Any], names)
+            names = list(whole)
+
+        fields: dict[str, Any] = {}
+        for name in names:
+            if name not in self._hints:
+                continue
+            hint = self._hints[name]
+            if self._is_list(name):
+                if whole is not None:
+                    items = whole[name]
+                else:
+                    keys: list[str] = json.loads(self.storage[self._key(name)])
+                    items = [json.loads(self.storage[self._key(name, k)]) for k in keys]
+                convert = _converter(get_args(hint)[0])
+                fields[name] = hint.__origin__(convert(v) for v in items)
+            else:
+                value = (
+                    whole[name]
+                    if whole is not None
+                    else json.loads(self.storage[self._key(name)])
+                )
+                fields[name] = _converter(hint)(value)
+        self._saved = None if whole is not None else fields
+        return self.cls(**fields)
+
+    def clear(self) -> None:
+        for k in list(self.storage):
+            if k == self.prefix or k.startswith(self.prefix + "."):
+                del self.storage[k]
+        self._saved = None
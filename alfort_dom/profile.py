@@ -0,0 +1,100 @@
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable
+
+
+@dataclass
+class FrameProfile:
+    """Timings (in milliseconds) and counters of one rendered frame.
+
+    `update_ms` and `messages` cover the messages handled since the previous
+    frame. Alfort applies patches while it diffs, so `diff_ms` is the render
+    time left once view and patch time are subtracted, node creation included.
+    """
+
+    frame: int
+    messages: int = 0
+    update_ms: float = 0.0
+    view_ms: float = 0.0
+    diff_ms: float = 0.0
+    patch_ms: float = 0.0
+    patches: Counter[str] = field(default_factory=Counter[str])
+    nodes_created: int = 0
+    nodes_removed: int = 0
+
+    @property
+    def total_ms(self) -> float:
+        return self.update_ms + self.view_ms + self.diff_ms + self.patch_ms
+
+
+class Profiler:
+    """Collects a FrameProfile per render into a ring buffer.
+
+    Pass an instance to `AlfortDom(profiler=...)`, then read `frames` or
+    `summary()` from the console or receive each frame through `on_frame`.
+    """
+
+    frames: deque[FrameProfile]
+    on_frame: Callable[[FrameProfile], None] | None
+    _current: FrameProfile
+    _count: int
+
+    def __init__(
+        self,
+        capacity: int = 120,
+        on_frame: Callable[[FrameProfile], None] | None = None,
+    ) -> None:
+        self.frames = deque(maxlen=capacity)
+        self.on_frame = on_frame
+        self._count = 0
+        self._current = FrameProfile(frame=0)
+        self._render_start = 0.0
+
+    def record_update(self, elapsed: float) -> None:
+        self._current.messages += 1
+        self._current.update_ms += elapsed * 1000
+
+    def record_view(self, elapsed: float) -> None:
+        self._current.view_ms += elapsed * 1000
+
+    def record_patch(self, patch: Any, elapsed: float) -> None:
+        self._current.patch_ms += elapsed * 1000
+        self._current.patches[type(patch).__name__] += 1
+
+    def record_flush(self, elapsed: float) -> None:
+        self._current.patch_ms += elapsed * 1000
+
+    def record_created(self, count: int = 1) -> None:
+        self._current.nodes_created += count
+
+    def record_removed(self, count: int = 1) -> None:
+        self._current.nodes_removed += count
+
+    def begin_frame(self) -> None:
+        self._render_start = perf_counter()
+
+    def end_frame(self) -> FrameProfile:
+        frame = self._current
+        render_ms = (perf_counter() - self._render_start) * 1000
+        frame.diff_ms = max(render_ms - frame.view_ms - frame.patch_ms, 0.0)
+        self.frames.append(frame)
+        self._count += 1
+        self._current = FrameProfile(frame=self._count)
+        if self.on_frame is not None:
+            self.on_frame(frame)
+        return frame
+
+    def clear(self) -> None:
+        self.frames.clear()
+
+    def summary(self) -> dict[str, float]:
+        """Mean and worst timings over the buffered frames."""
+        if not self.frames:
+            return {}
+        result: dict[str, float] = {"frames": len(self.frames)}
+        for name in ["update_ms", "view_ms", "diff_ms", "patch_ms", "total_ms"]:
+            values = [getattr(f, name) for f in self.frames]
+            result[f"mean_{name}"] = sum(values) / len(values)
+            result[f"max_{name}"] = max(values)
+        return result
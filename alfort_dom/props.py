@@ -0,0 +1,75 @@
+from typing import Any
+
+# Props known to be DOM properties, by tag; "*" applies to every element.
+KNOWN_PROPERTIES: dict[str, frozenset[str]] = {
+    "*": frozenset(
+        ["id", "className", "title", "hidden", "lang", "dir", "tabIndex"]
+        + ["textContent", "innerHTML", "innerText", "draggable", "spellcheck"]
+    ),
+    "a": frozenset(["href", "target", "download", "rel", "type"]),
+    "button": frozenset(["disabled", "type", "name", "value", "autofocus"]),
+    "form": frozenset(["action", "method", "noValidate", "target", "name"]),
+    "img": frozenset(["src", "alt", "width", "height", "srcset", "loading"]),
+    "input": frozenset(
+        ["value", "checked", "defaultValue", "defaultChecked", "indeterminate"]
+        + ["disabled", "readOnly", "required", "multiple", "autofocus"]
+        + ["type", "name", "placeholder", "autocomplete", "accept", "src", "alt"]
+        + ["min", "max", "step", "minLength", "maxLength", "pattern", "size"]
+    ),
+    "label": frozenset(["htmlFor"]),
+    "option": frozenset(["value", "selected", "defaultSelected", "disabled"]),
+    "select": frozenset(
+        ["value", "selectedIndex", "disabled", "multiple", "required", "name"]
+    ),
+    "td": frozenset(["colSpan", "rowSpan"]),
+    "textarea": frozenset(
+        ["value", "defaultValue", "disabled", "readOnly", "required", "name"]
+        + ["placeholder", "rows", "cols", "wrap", "autofocus", "maxLength"]
+    ),
+    "th": frozenset(["colSpan", "rowSpan"]),
+}
+
+
+class PropertyTable:
+    """Remembers per (tag, prop name) whether a prop is a DOM property.
+
+    Unknown pairs are probed with `hasattr` once, instead of on every write.
+    Names containing a dash, e.g. `data-*` and `aria-*`, are always attributes.
+    """
+
+    _table: dict[tuple[str, str], bool]
+    probes: int
+
+    def __init__(
+        self, known: dict[str, frozenset[str]] | None = KNOWN_PROPERTIES
+    ) -> None:
+        self._table = {}
+        self.probes = 0
+        self._known = known if known is not None else {}
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def is_property(self, tag: str | None, name: str, dom: Any) -> bool:
+        if "-" in name:
+            return False
+        if tag is None:
+            self.probes += 1
+            return hasattr(dom, name)
+
+        key = (tag, name)
+        if (result := self._table.get(key)) is None:
+            if name in self._known.get("*", ()) or name in self._known.get(tag, ()):
+                result = True
+            else:
+                self.probes += 1
+                result = hasattr(dom, name)
+            self._table[key] = result
+        return result
+
+    def clear(self) -> None:
+        self._table.clear()
+        self.probes = 0
+
+
+properties = PropertyTable()
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .backend import get_backend
+
+
+@dataclass
+class ProxyStats:
+    created: int = 0
+    destroyed: int = 0
+
+    @property
+    def live(self) -> int:
+        return self.created - self.destroyed
+
+
+stats = ProxyStats()
+
+
+def live_proxies() -> int:
+    """Number of proxies created through this module that are still alive."""
+    return stats.live
+
+
+def create_proxy(obj: Any) -> Any:
+    proxy = get_backend().create_proxy(obj)
+    stats.created += 1
+    return proxy
+
+
+def destroy_proxy(proxy: Any) -> None:
+    get_backend().destroy_proxy(proxy)
+    stats.destroyed += 1
+
+
+def create_once_callable(fun: Callable[[Any], Any]) -> Any:
+    """Wrap `fun` into a proxy which Pyodide destroys after its first call."""
+
+    def _once(*args: Any) -> Any:
+        stats.destroyed += 1
+        return fun(*args)
+
+    proxy = get_backend().create_once_callable(_once)
+    stats.created += 1
+    return proxy
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .backend import get_backend
+from .proxy import create_proxy
+
+
+@dataclass
+class FrameStats:
+    requested: int = 0
+    merged: int = 0
+    executed: int = 0
+
+
+class FrameScheduler:
+    """Enqueue which runs pending renders once per animation frame.
+
+    Render requests arriving before the next frame are merged, so a burst of
+    messages costs a single render. One persistent proxy is shared by all
+    the requestAnimationFrame calls.
+    """
+
+    stats: FrameStats
+    _pending: dict[Callable[[], None], None]
+    _proxy: Any | None
+
+    def __init__(self) -> None:
+        self.stats = FrameStats()
+        self._pending = {}
+        self._proxy = None
+
+    def __call__(self, render: Callable[[], None]) -> None:
+        self.stats.requested += 1
+        if render in self._pending:
+            self.stats.merged += 1
+            return
+
+        if not self._pending:
+            if self._proxy is None:
+                self._proxy = create_proxy(self._on_frame)
+            get_backend().window.requestAnimationFrame(self._proxy)
+        self._pending[render] = None
+
+    def _on_frame(self, _: Any) -> None:
+        pending = self._pending
+        self._pending = {}
+        self.stats.executed += 1
+        for render in pending:
+            render()
@@ -0,0 +1,102 @@
+"""Render a virtual DOM to HTML, e.g. to pre-render a page with plain CPython.
+
+The markup can be hydrated in the browser by `AlfortDom.hydrate`, which
+adopts the existing elements instead of recreating them.
+"""
+import html
+from typing import Any, cast
+
+from alfort.vdom import Props, VDom, VDomElement
+
+from .css import to_css_text
+from .headless import VOID_ELEMENTS
+from .keyed import KEY_PROP
+from .lazy import force
+
+# Separates adjacent text nodes, which the HTML parser would merge otherwise.
+TEXT_SEPARATOR = "<!-- -->"
+
+# DOM properties named otherwise than the attribute they reflect.
+ATTRIBUTE_NAMES = {
+    "className": "class",
+    "htmlFor": "for",
+    "tabIndex": "tabindex",
+    "readOnly": "readonly",
+    "noValidate": "novalidate",
+    "maxLength": "maxlength",
+    "minLength": "minlength",
+    "colSpan": "colspan",
+    "rowSpan": "rowspan",
+    "defaultValue": "value",
+    "defaultChecked": "checked",
+    "defaultSelected": "selected",
+}
+
+# DOM properties setting the content of an element rather than an attribute.
+CONTENT_PROPERTIES = frozenset(["textContent", "innerText", "innerHTML"])
+
+# DOM properties which no attribute reflects.
+UNREFLECTED_PROPERTIES = CONTENT_PROPERTIES | {"selectedIndex", "indeterminate"}
+
+
+def attribute_name(name: str) -> str:
+    """The name of the attribute which the prop `name` is rendered to."""
+    return ATTRIBUTE_NAMES.get(name, name)
+
+
+def render_to_string(vdom: VDom) -> str:
+    out: list[str] = []
+    _render(vdom, out)
+    return "".join(out)
+
+
+def _render_attribute(name: str, value: Any) -> str:
+    if name == "style" and isinstance(value, dict):
+        value = to_css_text(cast(dict[str, Any], value))
+    name = attribute_name(name)
+    if value is True:
+        return f" {name}"
+    return f' {name}="{html.escape(str(value))}"'
+
+
+def _content(props: Props) -> str | None:
+    if (inner_html := props.get("innerHTML")) is not None:
+        return str(inner_html)
+    for name in ["textContent", "innerText"]:
+        if (text := props.get(name)) is not None:
+            return html.escape(str(text), quote=False)
+    return None
+
+
+def _render(vdom: VDom, out: list[str]) -> None:
+    vdom = force(vdom)
+    match vdom:
+        case str():
+            out.append(html.escape(vdom, quote=False))
+        case VDomElement(tag, props, children):
+            attrs = "".join(
+                _render_attribute(k, v)
+                for k, v in props.items()
+                if not k.startswith("on")
+                and k != KEY_PROP
+                and k not in UNREFLECTED_PROPERTIES
+                and v is not None
+                and v is not False
+            )
+            out.append(f"<{tag}{attrs}>")
+            if tag.lower() in VOID_ELEMENTS:
+                return
+            if (content := _content(props)) is not None:
+                out.append(f"{content}</{tag}>")
+                return
+
+            after_text = False
+            for c in children:
+                is_text = isinstance(force(c), str)
+                if is_text and after_text:
+                    out.append(TEXT_SEPARATOR)
+                _render(c, out)
+                after_text = is_text
+            out.append(f"</{tag}>")
+        case _:
+            raise ValueError(f"Unknown vdom: {vdom}")
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+from alfort.vdom import VDom, VDomElement
+
+from .backend import Node
+from .keyed import KEY_PROP
+from .lazy import force
+from .ssr import UNREFLECTED_PROPERTIES
+
+# Properties which no attribute reflects, i.e. live state and content. A clone
+# does not carry them, or gets child nodes which its vdom does not know about.
+INSTANCE_PROPERTIES = UNREFLECTED_PROPERTIES | {"value", "checked", "selected"}
+
+
+def is_static(name: str, value: Any) -> bool:
+    """Whether a prop ends up as an attribute, which `cloneNode` copies."""
+    if name.startswith("on") or name in INSTANCE_PROPERTIES or value is None:
+        return False
+    if name == KEY_PROP:
+        return False
+    return isinstance(value, str | int | float) or (
+        name == "style" and isinstance(value, dict)
+    )
+
+
+def shape_of(vdom: VDom) -> Hashable:
+    vdom = force(vdom)
+    if isinstance(vdom, str):
+        return None
+    return (vdom.tag, tuple(vdom.props), tuple(shape_of(c) for c in vdom.children))
+
+
+@dataclass(frozen=True)
+class Template:
+    """A detached prototype subtree together with the vdom it was built from.
+
+    The static props and the texts of `vdom` are baked into `dom`, so a clone
+    only needs the props and texts which differ from them.
+    """
+
+    dom: Node
+    vdom: VDomElement
+
+
+class TemplateCache:
+    """Templates keyed by the shape of a subtree, i.e. its tags and prop names.
+
+    A template is built when a shape is seen for the second time, so subtrees
+    rendered only once are not paid for twice.
+    """
+
+    _templates: OrderedDict[Hashable, Template | None]
+    capacity: int
+    hits: int
+
+    def __init__(self, capacity: int = 256) -> None:
+        self._templates = OrderedDict()
+        self.capacity = capacity
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return sum(t is not None for t in self._templates.values())
+
+    def get(
+        self, vdom: VDomElement, build: Callable[[VDomElement], Node]
+    ) -> Template | None:
+        key = shape_of(vdom)
+        if key not in self._templates:
+            self._templates[key] = None
+            if len(self._templates) > self.capacity:
+                self._templates.popitem(last=False)
+            return None
+
+        self._templates.move_to_end(key)
+        template = self._templates[key]
+        if template is None:
+            template = Template(build(vdom), vdom)
+            self._templates[key] = template
+        else:
+            self.hits += 1
+        return template
+
+    def clear(self) -> None:
+        self._templates.clear()
@@ -0,0 +1,100 @@
+"""Virtual lists render only the rows in view, whatever the number of rows.
+
+    virtual_list(
+        count=len(model.rows),
+        row_height=24,
+        height=480,
+        scroll_top=model.scroll_top,
+        view_row=lambda i: view_row(model.rows[i]),
+        on_scroll=Scrolled,
+    )
+
+The list is a scrollable box of `height` pixels holding a spacer as tall as
+all the rows. Only the rows in view plus `overscan` rows on either side are
+rendered, each in one of a fixed number of slots positioned absolutely, so
+scrolling patches the nodes of the slots in place instead of creating and
+removing rows. The scroll position is read once per animation frame and sent
+as `on_scroll(scroll_top=...)`, which the update has to store in the model.
+"""
+import math
+from typing import Any, Callable, TypeVar
+
+from alfort.vdom import Props, VDom, el
+
+from .decode import decode
+from .event import sample_frame
+
+Msg = TypeVar("Msg")
+
+OVERSCAN = 5
+
+
+def slot_count(row_height: float, height: float, overscan: int = OVERSCAN) -> int:
+    """Number of rows rendered at most, i.e. of nodes the rows are drawn in."""
+    return math.ceil(height / row_height) + 1 + 2 * overscan
+
+
+def visible_range(
+    count: int,
+    row_height: float,
+    height: float,
+    scroll_top: float,
+    overscan: int = OVERSCAN,
+) -> range:
+    first = int(max(scroll_top, 0) // row_height)
+    last = math.ceil((max(scroll_top, 0) + height) / row_height)
+    return range(max(first - overscan, 0), min(last + overscan, count))
+
+
+def virtual_list(
+    count: int,
+    row_height: float,
+    height: float,
+    scroll_top: float,
+    view_row: Callable[[int], VDom],
+    on_scroll: Callable[..., Msg],
+    overscan: int = OVERSCAN,
+    props: Props | None = None,
+) -> VDom:
+    slots = slot_count(row_height, height, overscan)
+    rows = sorted(
+        visible_range(count, row_height, height, scroll_top, overscan),
+        key=lambda i: i % slots,
+    )
+    style: dict[str, Any] = {
+        "position": "absolute",
+        "left": "0",
+        "right": "0",
+        "height": f"{row_height}px",
+    }
+    return el(
+        "div",
+        {
+            **(props or {}),
+            "style": {
+                "height": f"{height}px",
+                "overflowY": "auto",
+                "position": "relative",
+            },
+            "onscroll": sample_frame(decode(on_scroll, scroll_top="target.scrollTop")),
+        },
+        [
+            el(
+                "div",
+                {
+                    "style": {
+                        "height": f"{count * row_height}px",
+                        "position": "relative",
+                    }
+                },
+                [
+                    el(
+                        "div",
+                        {"style": {**style, "top": f"{i * row_height}px"}},
+                        [view_row(i)],
+                    )
+                    for i in rows
+                ],
+            )
+        ],
+    )
@@ -0,0 +1,407 @@
+"""Split mode: update, view and diff in a Web Worker, DOM operations on the
+main thread.
+
+The worker runs a `WorkerApp`, which renders into handles instead of DOM
+nodes and posts each frame's DOM operations as one message. The main thread
+runs a `PatchApplier`, which replays those operations on the real DOM and
+posts the events back with their payload already read. Messages are lists of
+plain values, so they survive structured cloning as well as JSON, or with
+`binary=True` on both halves the bytes of `alfort_dom.codec`, which can be
+transferred as an ArrayBuffer::
+
+    # worker.py, run by Pyodide inside the Web Worker
+    use_backend(PyodideWorkerBackend())
+    app = WorkerApp(init=init, view=view, update=update, post=post_to_main)
+    js.self.onmessage = create_proxy(lambda e: app.on_message(e.data.to_py()))
+    app.main()
+
+    # main thread
+    applier = PatchApplier("root", post=post_to_worker)
+    worker.onmessage = create_proxy(lambda e: applier.on_message(e.data.to_py()))
+
+where `post_to_main` and `post_to_worker` call `postMessage` with `to_js(message)`.
+
+Handlers run in the worker on a stand-in event holding only the fields in
+`EVENT_PATHS` and the paths of `decode` handlers, and cannot prevent the
+default action, since it has already happened by the time they run.
+"""
+from itertools import count
+from typing import Any, Callable, Iterator, TypeVar, cast
+
+from alfort import Dispatch, Enqueue, Init, Update, View
+from alfort.sub import Subscriptions
+
+from .app import AlfortDom, DomNode
+from .backend import Element, Extractor, Node, get_backend
+from .batch import (
+    OP_CREATE_ELEMENT,
+    OP_CREATE_TEXT,
+    OP_INSERT_BEFORE,
+    OP_LISTEN,
+    OP_RELEASE,
+    OP_REMOVE_ATTRIBUTE,
+    OP_REMOVE_CHILD,
+    OP_SET_ATTRIBUTE,
+    OP_SET_PROPERTY,
+    OP_SET_STYLE,
+    OP_SET_TEXT,
+    OP_WIDTH,
+    PatchBuffer,
+)
+from .codec import Codec
+from .decode import Decoder
+from .delegate import (
+    ELEMENT_NODE,
+    NODE_ID_ATTRIBUTE,
+    NON_BUBBLING_EVENTS,
+    DelegatedNode,
+    EventDelegator,
+)
+from .event import PASSIVE_EVENTS, Limiter
+from .profile import Profiler
+from .proxy import create_proxy, destroy_proxy
+
+S = TypeVar("S")
+M = TypeVar("M")
+
+ROOT_ID = 0
+
+PATCH = "patch"  # [PATCH, ops], worker to main thread
+EVENT = "event"  # [EVENT, event type, node ids, values], main thread to worker
+
+# Event fields sent to the worker for every handler.
+EVENT_PATHS = (
+    "key",
+    "code",
+    "button",
+    "clientX",
+    "clientY",
+    "deltaX",
+    "deltaY",
+    "altKey",
+    "ctrlKey",
+    "metaKey",
+    "shiftKey",
+    "target.value",
+    "target.checked",
+    "target.scrollTop",
+)
+
+
+class RemoteNode:
+    """Worker-side handle of a DOM node living on the main thread."""
+
+    __slots__ = ["id"]
+
+    def __init__(self, id: int) -> None:
+        self.id = id
+
+
+class PatchStream(PatchBuffer):
+    """Records DOM operations against node ids which stay valid across frames,
+    and posts them as one message per flush."""
+
+    _ids: Iterator[int]
+    codec: Codec | None
+
+    def __init__(self, post: Callable[[Any], None], codec: Codec | None = None) -> None:
+        super().__init__()
+        self.post = post
+        self.codec = codec
+        self._ids = count(ROOT_ID + 1)
+
+    def _node_id(self, dom: Any) -> int:
+        return dom.id
+
+    def create_element(self, tag: str) -> Element:
+        node = RemoteNode(next(self._ids))
+        self.ops.extend((OP_CREATE_ELEMENT, node.id, tag, None))
+        return cast(Element, node)
+
+    def create_text(self, text: str) -> Node:
+        node = RemoteNode(next(self._ids))
+        self.ops.extend((OP_CREATE_TEXT, node.id, text, None))
+        return cast(Node, node)
+
+    def release(self, dom: Any) -> None:
+        self.ops.extend((OP_RELEASE, dom.id, None, None))
+
+    def listen(self, event_type: str, paths: list[str]) -> None:
+        self.ops.extend((OP_LISTEN, ROOT_ID, event_type, paths))
+
+    def flush(self) -> None:
+        if not self.ops:
+            return
+        ops = self.ops
+        self.clear()
+        if self.codec is not None:
+            self.post(self.codec.encode_patch(ops))
+        else:
+            self.post([PATCH, ops])
+
+
+def _paths_of(handler: Any) -> tuple[str, ...]:
+    while isinstance(handler, Limiter):
+        handler = cast(Limiter[Any], handler).handler
+    if isinstance(handler, Decoder):
+        return cast(Decoder[Any], handler).paths
+    return ()
+
+
+class RemoteDelegator(EventDelegator):
+    """Asks the main thread to listen to event types, and to send the fields
+    the handlers read, and looks the nodes up by the ids it sends back."""
+
+    _stream: PatchStream
+    _paths: dict[str, list[str]]
+    _handlers: dict[str, DelegatedNode]
+
+    def __init__(self, stream: PatchStream) -> None:
+        super().__init__()
+        self._stream = stream
+        self._paths = {}
+        # no DOM listener keeps the nodes alive here, so hold them until released
+        self._handlers = {}
+
+    def register(self, node: DelegatedNode) -> str:
+        node_id = str(cast(RemoteNode, node.dom).id)
+        self._handlers[node_id] = node
+        return node_id
+
+    def unregister(self, node_id: str) -> None:
+        self._handlers.pop(node_id, None)
+
+    def listen(self, event_type: str, handler: Any = None) -> None:
+        known = self._paths.get(event_type)
+        paths: list[str] = list(EVENT_PATHS) if known is None else known
+        new = [p for p in dict.fromkeys(_paths_of(handler)) if p not in paths]
+        if known is not None and not new:
+            return
+        # paths are only appended, so the values of the events sent before
+        # the main thread catches up still line up with them
+        paths.extend(new)
+        self._paths[event_type] = paths
+        self._stream.listen(event_type, list(paths))
+
+    def dispatch(self, event_type: str, ids: list[int], values: list[Any]) -> None:
+        event = RemoteEvent(event_type, self._paths.get(event_type, []), values)
+        for node_id in ids:
+            if (node := self._handlers.get(str(node_id))) is not None:
+                node.handle(event)
+            if event.cancelBubble:
+                break
+
+
+class _Fields:
+    pass
+
+
+class RemoteEvent:
+    """Stand-in for a DOM event in the worker, holding the fields read on
+    the main thread at their dotted paths."""
+
+    def __init__(self, type: str, paths: list[str], values: list[Any]) -> None:
+        self.type = type
+        self.cancelBubble = False
+        for path, value in zip(paths, values):
+            *parents, name = path.split(".")
+            fields: Any = self
+            for parent in parents:
+                if not isinstance(child := getattr(fields, parent, None), _Fields):
+                    child = _Fields()
+                    setattr(fields, parent, child)
+                fields = child
+            setattr(fields, name, value)
+
+    def stopPropagation(self) -> None:
+        self.cancelBubble = True
+
+    def preventDefault(self) -> None:
+        pass
+
+
+class _WorkerNode(DomNode[M]):
+    """Node which also frees its handle on the main thread when released."""
+
+    stream: PatchStream
+
+    def __init__(
+        self,
+        stream: PatchStream,
+        dom: Node,
+        dispatch: Dispatch[M],
+        delegator: RemoteDelegator,
+        profiler: Profiler | None,
+        tag: str | None,
+    ) -> None:
+        super().__init__(dom, dispatch, stream, delegator, profiler, tag)
+        self.stream = stream
+
+    def release(self) -> None:
+        super().release()
+        self.stream.release(self.dom)
+
+
+class WorkerApp(AlfortDom[S, M]):
+    """AlfortDom rendering into a patch stream posted through `post`."""
+
+    _stream: PatchStream
+    _remote: RemoteDelegator
+    _codec: Codec | None
+
+    def __init__(
+        self,
+        init: Init[S, M],
+        view: View[S],
+        update: Update[M, S],
+        post: Callable[[Any], None],
+        enqueue: Enqueue | None = None,
+        subscriptions: Subscriptions[S, M] | None = None,
+        profiler: Profiler | None = None,
+        binary: bool = False,
+    ) -> None:
+        super().__init__(init, view, update, enqueue, subscriptions, profiler=profiler)
+        self._codec = Codec() if binary else None
+        self._stream = PatchStream(post, self._codec)
+        self._remote = RemoteDelegator(self._stream)
+        self._buffer = self._stream
+        self._delegator = self._remote
+
+    def _new_node(
+        self, dom: Node, dispatch: Dispatch[M], tag: str | None = None
+    ) -> DomNode[M]:
+        return _WorkerNode[M](
+            self._stream, dom, dispatch, self._remote, self.profiler, tag
+        )
+
+    def _create_element_dom(self, tag: str) -> Element:
+        return self._stream.create_element(tag)
+
+    def _create_text_dom(self, text: str) -> Node:
+        return self._stream.create_text(text)
+
+    def on_message(self, message: Any) -> None:
+        if self._codec is not None:
+            message = self._codec.decode(message)
+        match message:
+            case [str(kind), str(event_type), [*ids], [*values]] if kind == EVENT:
+                self._remote.dispatch(event_type, ids, values)
+            case _:
+                raise ValueError(f"Unknown message: {message}")
+
+    def main(self, root: str | None = None) -> None:
+        """Start rendering; `root` is picked by the `PatchApplier` instead."""
+        root_dom = cast(Element, RemoteNode(ROOT_ID))
+        self._main(DomNode[M](root_dom, ops=self._stream, profiler=self.profiler))
+
+
+class PatchApplier:
+    """Main-thread half of split mode, applying the patch stream of a
+    `WorkerApp` below the element with id `root` and posting its events back.
+
+    The DOM operations of a message are replayed with a single call of the
+    batch interpreter; only node creation goes through the FFI one by one.
+    """
+
+    nodes: dict[int, Node]
+    _paths: dict[str, tuple[str, ...]]
+    _extractors: dict[str, Extractor]
+    _listener: Any | None
+    _codec: Codec | None
+
+    def __init__(
+        self, root: str, post: Callable[[Any], None], binary: bool = False
+    ) -> None:
+        backend = get_backend()
+        root_dom = backend.document.getElementById(root)
+        if root_dom is None:
+            raise ValueError(f"Root element not found: {root}")
+        self.root = root_dom
+        self.post = post
+        self.nodes = {ROOT_ID: root_dom}
+        self._paths = {}
+        self._extractors = {}
+        self._listener = None
+        self._buffer = PatchBuffer()
+        self._codec = Codec() if binary else None
+
+    def on_message(self, message: Any) -> None:
+        if self._codec is not None:
+            message = self._codec.decode(message)
+        match message:
+            case [str(kind), [*ops]] if kind == PATCH:
+                self.apply(ops)
+            case _:
+                raise ValueError(f"Unknown message: {message}")
+
+    def apply(self, ops: list[Any]) -> None:
+        document = get_backend().document
+        nodes, buffer = self.nodes, self._buffer
+        for i in range(0, len(ops), OP_WIDTH):
+            op, node_id, a, b = ops[i : i + OP_WIDTH]
+            if op == OP_CREATE_ELEMENT:
+                nodes[node_id] = document.createElement(a)
+            elif op == OP_CREATE_TEXT:
+                nodes[node_id] = document.createTextNode(a)
+            elif op == OP_RELEASE:
+                del nodes[node_id]
+            elif op == OP_LISTEN:
+                self._listen(a, tuple(b))
+            elif op == OP_INSERT_BEFORE:
+                reference = None if b < 0 else nodes[b]
+                buffer.insert_before(nodes[node_id], nodes[a], reference)
+            elif op == OP_REMOVE_CHILD:
+                buffer.remove_child(nodes[node_id], nodes[a])
+            elif op == OP_SET_ATTRIBUTE:
+                buffer.set_attribute(nodes[node_id], a, b)
+            elif op == OP_REMOVE_ATTRIBUTE:
+                buffer.remove_attribute(nodes[node_id], a)
+            elif op == OP_SET_PROPERTY:
+                buffer.set_property(nodes[node_id], a, b)
+            elif op == OP_SET_STYLE:
+                buffer.set_style(nodes[node_id], a, b)
+            elif op == OP_SET_TEXT:
+                buffer.set_text(nodes[node_id], a)
+            else:
+                raise ValueError(f"Unknown op: {op}")
+        buffer.flush()
+
+    def _listen(self, event_type: str, paths: tuple[str, ...]) -> None:
+        backend = get_backend()
+        if event_type not in self._paths:
+            if self._listener is None:
+                self._listener = create_proxy(self._on_event)
+            options: Any = True
+            if event_type in PASSIVE_EVENTS:
+                options = backend.to_js({"capture": True, "passive": True})
+            self.root.addEventListener(event_type, self._listener, options)
+        self._paths[event_type] = paths
+        self._extractors[event_type] = backend.compile_extractor(paths)
+
+    def _on_event(self, event: Any) -> None:
+        event_type: str = event.type
+        bubbles = event_type not in NON_BUBBLING_EVENTS
+        ids: list[int] = []
+        target = event.target
+        while target is not None and target != self.root:
+            if target.nodeType == ELEMENT_NODE:
+                node_id = target.getAttribute(NODE_ID_ATTRIBUTE)
+                if node_id is not None:
+                    ids.append(int(node_id))
+            if not bubbles:
+                break
+            target = target.parentNode
+        if ids:
+            values = self._extractors[event_type](event)
+            if self._codec is not None:
+                self.post(self._codec.encode_event(event_type, ids, values))
+            else:
+                self.post([EVENT, event_type, ids, values])
+
+    def close(self) -> None:
+        if self._listener is not None:
+            for event_type in self._paths:
+                self.root.removeEventListener(event_type, self._listener, True)
+            destroy_proxy(self._listener)
+            self._listener = None
+        self._paths.clear()
@@ -0,0 +1,141 @@
+"""Size and speed of the binary patch encoding against JSON.
+
+The js-framework-benchmark operations are run in split mode, and the patch
+streams the worker posts are encoded both ways::
+
+    $ python -m benchmarks.codec --output codec.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import time
+from typing import Any, Callable
+
+import alfort_dom
+from alfort_dom.backend import use_backend
+from alfort_dom.codec import Codec
+from alfort_dom.headless import HeadlessBackend
+from alfort_dom.profile import Profiler
+from alfort_dom.worker import PatchApplier, WorkerApp
+
+from .js_framework import Msg, Page, State, create_view, init, operations, update
+
+
+class WorkerPage(Page):
+    """The benchmark app in split mode, recording the ops the worker posts."""
+
+    streams: list[list[Any]]
+
+    def __init__(self, rows: int, lots_of_rows: int, **options: Any) -> None:
+        self.backend = use_backend(HeadlessBackend())
+        self.profiler = Profiler()
+        self.streams = []
+        root = self.backend.document.createElement("div")
+        root.id = "main"
+        self.backend.document.body.appendChild(root)
+
+        def _to_main(message: list[Any]) -> None:
+            self.streams.append(message[1])
+            applier.on_message(message)
+
+        app = WorkerApp[State, Msg](
+            init=init,
+            view=create_view(rows, lots_of_rows),
+            update=update,
+            post=_to_main,
+        )
+        applier = PatchApplier("main", post=app.on_message)
+        app.main()
+        self.backend.window.run_frame()
+
+
+def _per_second(count: int, run: Callable[[], Any], repeat: int) -> float:
+    times: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return count / max(statistics.median(times), 1e-9)
+
+
+def measure(ops: list[Any], repeat: int) -> dict[str, Any]:
+    count = len(ops) // 4
+    message = ["patch", ops]
+    data = json.dumps(message)
+
+    # names are interned once per connection, so measure a warm codec
+    sender, receiver = Codec(), Codec()
+    receiver.decode(sender.encode_patch(ops))
+    binary = sender.encode_patch(ops)
+
+    return {
+        "ops": count,
+        "json_bytes": len(data.encode()),
+        "binary_bytes": len(binary),
+        "json_bytes_per_op": len(data.encode()) / count,
+        "binary_bytes_per_op": len(binary) / count,
+        "encode_ops_per_s": {
+            "json": _per_second(count, lambda: json.dumps(message), repeat),
+            "binary": _per_second(count, lambda: sender.encode_patch(ops), repeat),
+        },
+        "decode_ops_per_s": {
+            "json": _per_second(count, lambda: json.loads(data), repeat),
+            "binary": _per_second(count, lambda: receiver.decode(binary), repeat),
+        },
+    }
+
+
+def run(repeat: int = 5, rows: int = 1000, lots_of_rows: int = 10000) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for operation in operations(rows, lots_of_rows):
+        page = WorkerPage(rows, lots_of_rows)
+        operation.setup(page)
+        page.streams.clear()
+        operation.run(page)
+        ops = [op for stream in page.streams for op in stream]
+        if ops:
+            results[operation.name] = measure(ops, repeat)
+    return {
+        "alfort_dom": alfort_dom.__version__,
+        "python": platform.python_version(),
+        "rows": rows,
+        "lots_of_rows": lots_of_rows,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__ and __doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--lots-of-rows", type=int, default=10000)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.rows, args.lots_of_rows)
+    print(
+        f"{'':>16}  {'ops':>7}  {'bytes/op':>13}  {'encode Mops/s':>13}  "
+        f"{'decode Mops/s':>13}"
+    )
+    print(
+        f"{'':>16}  {'':>7}  {'json':>6} {'bin':>6}  {'json':>6} {'bin':>6}  "
+        f"{'json':>6} {'bin':>6}"
+    )
+    for name, r in report["results"].items():
+        enc, dec = r["encode_ops_per_s"], r["decode_ops_per_s"]
+        print(
+            f"{name:>16}  {r['ops']:>7}  "
+            f"{r['json_bytes_per_op']:6.1f} {r['binary_bytes_per_op']:6.1f}  "
+            f"{enc['json'] / 1e6:6.2f} {enc['binary'] / 1e6:6.2f}  "
+            f"{dec['json'] / 1e6:6.2f} {dec['binary'] / 1e6:6.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""Benchmarks modeled on the js-framework-benchmark operations.
+
+The app is rendered into the headless DOM, so the numbers measure the Python
+side of alfort_dom (view, diff and patch) plus the number of calls that would
+cross Pyodide's FFI in a browser::
+
+    $ python -m benchmarks.js_framework --output benchmark.json
+    $ python -m benchmarks.js_framework --batched --delegated --templates
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Any, Callable, TypeAlias
+
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+import alfort_dom
+from alfort_dom import AlfortDom
+from alfort_dom.backend import use_backend
+from alfort_dom.headless import Element, Event, HeadlessBackend, Node
+from alfort_dom.profile import Profiler
+
+ADJECTIVES = (
+    "pretty large big small tall short long handsome"
+    " plain quaint clean elegant easy angry crazy"
+).split()
+COLOURS = "red yellow blue green pink brown purple white black orange".split()
+NOUNS = (
+    "table chair house bbq desk car pony cookie sandwich burger pizza mouse keyboard"
+).split()
+
+
+@dataclass(frozen=True)
+class Row:
+    id: int
+    label: str
+
+
+@dataclass(frozen=True)
+class State:
+    rows: tuple[Row, ...]
+    selected: int | None
+    next_id: int
+
+
+@dataclass(frozen=True)
+class Run:
+    count: int
+
+
+@dataclass(frozen=True)
+class Add:
+    count: int
+
+
+@dataclass(frozen=True)
+class Update:
+    ...
+
+
+@dataclass(frozen=True)
+class Clear:
+    ...
+
+
+@dataclass(frozen=True)
+class Swap:
+    ...
+
+
+@dataclass(frozen=True)
+class Select:
+    id: int
+
+
+@dataclass(frozen=True)
+class Remove:
+    id: int
+
+
+Msg: TypeAlias = Run | Add | Update | Clear | Swap | Select | Remove
+
+_random = random.Random(0)
+
+
+def build_rows(next_id: int, count: int) -> tuple[Row, ...]:
+    return tuple(
+        Row(
+            next_id + i,
+            f"{_random.choice(ADJECTIVES)} {_random.choice(COLOURS)} "
+            f"{_random.choice(NOUNS)}",
+        )
+        for i in range(count)
+    )
+
+
+def init() -> tuple[State, list[Effect[Msg]]]:
+    return (State(rows=(), selected=None, next_id=1), [])
+
+
+def update(msg: Msg, state: State) -> tuple[State, list[Effect[Msg]]]:
+    match msg:
+        case Run(count):
+            rows = build_rows(state.next_id, count)
+            return (State(rows, None, state.next_id + count), [])
+        case Add(count):
+            rows = state.rows + build_rows(state.next_id, count)
+            return (replace(state, rows=rows, next_id=state.next_id + count), [])
+        case Update():
+            rows = tuple(
+                replace(r, label=r.label + " !!!") if i % 10 == 0 else r
+                for i, r in enumerate(state.rows)
+            )
+            return (replace(state, rows=rows), [])
+        case Clear():
+            return (replace(state, rows=(), selected=None), [])
+        case Swap() if len(state.rows) > 998:
+            rows = list(state.rows)
+            rows[1], rows[998] = rows[998], rows[1]
+            return (replace(state, rows=tuple(rows)), [])
+        case Select(id_):
+            return (replace(state, selected=id_), [])
+        case Remove(id_):
+            rows = tuple(r for r in state.rows if r.id != id_)
+            return (replace(state, rows=rows), [])
+        case _:
+            return (state, [])
+
+
+def view_button(id_: str, title: str, msg: Msg) -> VDom:
+    return el(
+        "div",
+        {"class": "col-sm-6 smallpad"},
+        [
+            el(
+                "button",
+                {
+                    "type": "button",
+                    "class": "btn btn-primary btn-block",
+                    "id": id_,
+                    "onclick": msg,
+                },
+                [title],
+            )
+        ],
+    )
+
+
+def view_row(row: Row, selected: bool) -> VDom:
+    return el(
+        "tr",
+        {"key": row.id, "class": "danger" if selected else ""},
+        [
+            el("td", {"class": "col-md-1"}, [str(row.id)]),
+            el(
+                "td",
+                {"class": "col-md-4"},
+                [el("a", {"onclick": Select(row.id)}, [row.label])],
+            ),
+            el(
+                "td",
+                {"class": "col-md-1"},
+                [
+                    el(
+                        "a",
+                        {"onclick": Remove(row.id)},
+                        [
+                            el(
+                                "span",
+                                {
+                                    "class": "glyphicon glyphicon-remove",
+                                    "aria-hidden": "true",
+                                },
+                                [],
+                            )
+                        ],
+                    )
+                ],
+            ),
+            el("td", {"class": "col-md-6"}, []),
+        ],
+    )
+
+
+def create_view(rows: int, lots_of_rows: int) -> Callable[[State], VDom]:
+    def _view(state: State) -> VDom:
+        return el(
+            "div",
+            {"class": "container"},
+            [
+                el(
+                    "div",
+                    {"class": "jumbotron"},
+                    [
+                        view_button("run", f"Create {rows} rows", Run(rows)),
+                        view_button(
+                            "runlots", f"Create {lots_of_rows} rows", Run(lots_of_rows)
+                        ),
+                        view_button("add", f"Append {rows} rows", Add(rows)),
+                        view_button("update", "Update every 10th row", Update()),
+                        view_button("clear", "Clear", Clear()),
+                        view_button("swaprows", "Swap Rows", Swap()),
+                    ],
+                ),
+                el(
+                    "table",
+                    {"class": "table table-hover table-striped test-data"},
+                    [
+                        el(
+                            "tbody",
+                            {"id": "tbody"},
+                            [view_row(r, r.id == state.selected) for r in state.rows],
+                        )
+                    ],
+                ),
+            ],
+        )
+
+    return _view
+
+
+# Benchmark harness
+
+
+class Page:
+    backend: HeadlessBackend
+    profiler: Profiler
+
+    def __init__(self, rows: int, lots_of_rows: int, **options: Any) -> None:
+        self.backend = use_backend(HeadlessBackend())
+        self.profiler = Profiler()
+        root = self.backend.document.createElement("div")
+        root.id = "main"
+        self.backend.document.body.appendChild(root)
+        app = AlfortDom[State, Msg](
+            init=init,
+            view=create_view(rows, lots_of_rows),
+            update=update,
+            profiler=self.profiler,
+            **options,
+        )
+        app.main(root="main")
+        self.backend.window.run_frame()
+
+    def element(self, id_: str) -> Element:
+        element = self.backend.document.getElementById(id_)
+        assert element is not None
+        return element
+
+    def click(self, target: Node) -> None:
+        target.dispatchEvent(Event("click"))
+        self.backend.window.run_frame()
+
+    def click_button(self, id_: str) -> None:
+        self.click(self.element(id_))
+
+    def row_link(self, index: int, column: int) -> Node:
+        tr = self.element("tbody").childNodes[index]
+        link = tr.childNodes[column].firstChild
+        assert link is not None
+        return link
+
+
+PHASES = ["update_ms", "view_ms", "diff_ms", "patch_ms"]
+
+
+@dataclass(frozen=True)
+class Operation:
+    name: str
+    setup: Callable[[Page], None]
+    run: Callable[[Page], None]
+
+
+def operations(rows: int, lots_of_rows: int) -> list[Operation]:
+    def _nothing(_: Page) -> None:
+        pass
+
+    def _create(page: Page) -> None:
+        page.click_button("run")
+
+    return [
+        Operation(f"create_{rows}", _nothing, _create),
+        Operation(
+            f"create_{lots_of_rows}", _nothing, lambda p: p.click_button("runlots")
+        ),
+        Operation("replace_all", _create, _create),
+        Operation("partial_update", _create, lambda p: p.click_button("update")),
+        Operation("select_row", _create, lambda p: p.click(p.row_link(1, 1))),
+        Operation("swap_rows", _create, lambda p: p.click_button("swaprows")),
+        Operation("remove_row", _create, lambda p: p.click(p.row_link(1, 2))),
+        Operation(f"append_{rows}", _create, lambda p: p.click_button("add")),
+        Operation("clear", _create, lambda p: p.click_button("clear")),
+    ]
+
+
+def measure(
+    operation: Operation,
+    repeat: int,
+    rows: int,
+    lots_of_rows: int,
+    **options: Any,
+) -> dict[str, Any]:
+    times: list[float] = []
+    phases: dict[str, list[float]] = {k: [] for k in PHASES}
+    patches: Counter[str] = Counter()
+    ffi_calls: Counter[str] = Counter()
+    for _ in range(repeat):
+        page = Page(rows, lots_of_rows, **options)
+        operation.setup(page)
+        page.backend.ffi.reset()
+        page.profiler.clear()
+        start = time.perf_counter()
+        operation.run(page)
+        times.append((time.perf_counter() - start) * 1000)
+
+        for k in PHASES:
+            phases[k].append(sum(getattr(f, k) for f in page.profiler.frames))
+        patches = sum((f.patches for f in page.profiler.frames), Counter[str]())
+        ffi_calls = Counter(page.backend.ffi.calls)
+
+    return {
+        "wall_ms": {
+            "median": statistics.median(times),
+            "min": min(times),
+            "max": max(times),
+        },
+        "phases_ms": {k: statistics.median(v) for k, v in phases.items()},
+        "patches": dict(sorted(patches.items())),
+        "ffi_calls": sum(ffi_calls.values()),
+        "ffi_calls_by_name": dict(sorted(ffi_calls.items())),
+    }
+
+
+def run(
+    repeat: int = 5, rows: int = 1000, lots_of_rows: int = 10000, **options: Any
+) -> dict[str, Any]:
+    return {
+        "alfort_dom": alfort_dom.__version__,
+        "python": platform.python_version(),
+        "options": options,
+        "rows": rows,
+        "lots_of_rows": lots_of_rows,
+        "repeat": repeat,
+        "results": {
+            op.name: measure(op, repeat, rows, lots_of_rows, **options)
+            for op in operations(rows, lots_of_rows)
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__ and __doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--lots-of-rows", type=int, default=10000)
+    parser.add_argument("--batched", action="store_true")
+    parser.add_argument("--delegated", action="store_true")
+    parser.add_argument("--templates", action="store_true")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    options = {
+        k: True for k in ["batched", "delegated", "templates"] if getattr(args, k)
+    }
+    report = run(args.repeat, args.rows, args.lots_of_rows, **options)
+    for name, result in report["results"].items():
+        patches = ", ".join(f"{k}={v}" for k, v in result["patches"].items())
+        print(
+            f"{name:>16}: {result['wall_ms']['median']:9.2f} ms"
+            f"  ffi={result['ffi_calls']:<7} {patches}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,26 @@
 # ported from https://github.com/tastejs/todomvc/blob/master/examples/elm/src/Main.elm
 import functools
-import json
-from dataclasses import asdict, dataclass, replace
+from dataclasses import dataclass, replace
 from typing import Any, TypeAlias, Union
 
 from alfort import Dispatch, Effect, Update
 from alfort.vdom import VDom, el
 
-from alfort_dom import AlfortDom, local_storage, location
+from alfort_dom import AlfortDom, lazy, local_storage, location
 from alfort_dom.dom import HTMLElement, dom_effect
 from alfort_dom.event import handler
+from alfort_dom.persist import Persister
 
 
 def save_model(model: "Model") -> None:
-    local_storage["todos-alfort"] = json.dumps(asdict(model))
+    persister.save(model)
 
 
 def load_model() -> "Model":
-    serialized_model: str | None = local_storage.get("todos-alfort")
-    if serialized_model is None:
+    model = persister.load()
+    if model is None:
         return Model(entries=[], field="", uid=0, visibility="all")
-
-    obj = json.loads(serialized_model)
-    obj["entries"] = [Entry(**e) for e in obj["entries"]]
-    return Model(**obj)
+    return model
 
 
 def with_local_storage(update: Update["Msg", "Model"]) -> Update["Msg", "Model"]:
@@ -65,6 +62,11 @@ class Model:
     visibility: str
 
 
+persister = Persister(
+    Model, local_storage, "todos-alfort", keys={"entries": lambda e: e.id}
+)
+
+
 def init() -> tuple[Model, list[Effect["Msg"]]]:
     model = replace(load_model(), visibility=visibility_from_url())
     return (model, [])
@@ -236,8 +238,8 @@ def view(model: Model) -> VDom:
                 {"class": "todoapp"},
                 [
                     view_input(model.field),
-                    view_entries(model.visibility, model.entries),
-                    view_controls(model.visibility, model.entries),
+                    lazy(view_entries, model.visibility, model.entries),
+                    lazy(view_controls, model.visibility, model.entries),
                 ],
             ),
             info_footer(),
@@ -317,7 +319,7 @@ def view_entries(visibility: str, entries: list[Entry]) -> VDom:
             el(
                 "ul",
                 {"class": "todo-list"},
-                [view_entry(e) for e in entries if is_visible(e)],
+                [lazy(view_entry, e, key=e.id) for e in entries if is_visible(e)],
             ),
         ],
     )
@@ -490,6 +492,7 @@ def info_footer() -> VDom:
     )
 
 
+local_storage.enable_cache()
 app = AlfortDom[Model, Msg](
     init=init,
     view=view,
@@ -1,9 +1,16 @@
-from typing import Iterator, Protocol
+from typing import Any, Callable, Iterable, Iterator, Protocol
 
 from pyodide import JsProxy
 
+class Performance(Protocol):
+    def now(self) -> float: ...
+
 class Window(Protocol):
-    def requestAnimationFrame(self, callback: JsProxy) -> None: ...
+    def requestAnimationFrame(self, callback: JsProxy) -> int: ...
+    def cancelAnimationFrame(self, handle: int) -> None: ...
+    def setTimeout(self, callback: JsProxy, delay: float = ...) -> int: ...
+    @property
+    def performance(self) -> Performance: ...
 
 class Storage(Protocol):
     def setItem(self, key: str, value: str) -> None: ...
@@ -21,8 +28,14 @@ class HTMLElement(Protocol):
         self, child: HTMLElement, reference: HTMLElement | None = ...
     ) -> None: ...
     def removeChild(self, child: HTMLElement) -> None: ...
-    def addEventListener(self, event_type: str, listener: JsProxy) -> None: ...
-    def removeEventListener(self, event_type: str, listener: JsProxy) -> None: ...
+    def cloneNode(self, deep: bool = ...) -> HTMLElement: ...
+    def addEventListener(
+        self, event_type: str, listener: JsProxy, options: Any = ...
+    ) -> None: ...
+    def removeEventListener(
+        self, event_type: str, listener: JsProxy, options: Any = ...
+    ) -> None: ...
+    def getAttribute(self, name: str) -> str | None: ...
     def setAttribute(self, name: str, value: str) -> None: ...
     def removeAttribute(self, name: str) -> None: ...
     def focus(self) -> None: ...
@@ -35,17 +48,29 @@ class HTMLElement(Protocol):
 
 class Text(HTMLElement): ...
 
+class ObjectConstructor(Protocol):
+    def fromEntries(self, entries: Iterable[Any]) -> Any: ...
+
+class FunctionConstructor(Protocol):
+    def new(self, *args: str) -> Callable[..., Any]: ...
+
 class Location(Protocol):
     def assign(self, url: str) -> None: ...
     def reload(self) -> None: ...
     def replace(self, url: str) -> None: ...
 
 class HTMLDocument(Protocol):
+    @property
+    def hidden(self) -> bool: ...
     def createTextNode(self, text: str) -> Text: ...
-    def createElement(self, tag: str, props: JsProxy) -> HTMLElement: ...
+    def createElement(self, tag: str, props: JsProxy = ...) -> HTMLElement: ...
     def getElementById(self, id: str) -> HTMLElement: ...
-    def addEventListener(self, event_type: str, listener: JsProxy) -> None: ...
-    def removeEventListener(self, event_type: str, listener: JsProxy) -> None: ...
+    def addEventListener(
+        self, event_type: str, listener: JsProxy, options: Any = ...
+    ) -> None: ...
+    def removeEventListener(
+        self, event_type: str, listener: JsProxy, options: Any = ...
+    ) -> None: ...
     @property
     def location(self) -> Location: ...
 
@@ -53,3 +78,6 @@ document: HTMLDocument
 location: Location
 localStorage: Storage
 window: Window
+Function: FunctionConstructor
+Object: ObjectConstructor
+indexedDB: Any
@@ -31,6 +31,7 @@ class JsProxy(Any):
     def from_file(self, file: IOBase) -> None: ...
     def _into_file(self, file: IOBase) -> None: ...
     def to_string(self, encoding: str | None = ...) -> str: ...
+    def destroy(self) -> None: ...
 
 def create_once_callable(obj: Callable[[Any], Any]) -> JsProxy: ...
 def create_proxy(obj: Any) -> JsProxy: ...
@@ -0,0 +1,20 @@
+import pytest
+
+from alfort_dom.backend import use_backend
+from alfort_dom.headless import Element, HeadlessBackend
+
+
+@pytest.fixture
+def backend() -> HeadlessBackend:
+    backend = HeadlessBackend()
+    root = backend.document.createElement("div")
+    root.id = "root"
+    backend.document.body.appendChild(root)
+    return use_backend(backend)
+
+
+@pytest.fixture
+def root(backend: HeadlessBackend) -> Element:
+    root = backend.document.getElementById("root")
+    assert root is not None
+    return root
@@ -1,2 +1,493 @@
-def test_ok():
-    assert True
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import AlfortDom, lazy
+from alfort_dom.app import listener_stats
+from alfort_dom.backend import use_backend
+from alfort_dom.headless import Element, Event, HeadlessBackend
+from alfort_dom.profile import Profiler
+from alfort_dom.props import properties
+from alfort_dom.proxy import live_proxies
+from alfort_dom.template import is_static
+
+
+@dataclass(frozen=True)
+class Add:
+    value: int
+
+
+@dataclass(frozen=True)
+class SetCount:
+    value: int
+
+
+def _init() -> tuple[int, list[Effect[Any]]]:
+    return (2, [])
+
+
+def _update(msg: Any, state: int) -> tuple[int, list[Effect[Any]]]:
+    match msg:
+        case Add(value):
+            return (state + value, [])
+        case SetCount(value):
+            return (value, [])
+        case _:
+            return (state, [])
+
+
+def _view(state: int) -> VDom:
+    return el(
+        "div",
+        {"id": "counter", "style": {"color": "red"}},
+        [
+            el("button", {"id": "inc", "onclick": Add(1)}, ["+"]),
+            el(
+                "ul",
+                {},
+                [el("li", {"class": f"item-{i}"}, [str(i)]) for i in range(state)],
+            ),
+        ],
+    )
+
+
+def _app(**kwargs: Any) -> AlfortDom[int, Any]:
+    return AlfortDom[int, Any](init=_init, view=_view, update=_update, **kwargs)
+
+
+def _click(backend: HeadlessBackend, id: str) -> None:
+    target = backend.document.getElementById(id)
+    assert target is not None
+    target.dispatchEvent(Event("click"))
+
+
+def test_render_initial_view(backend: HeadlessBackend, root: Element) -> None:
+    _app().main(root="root")
+    assert root.innerHTML == ""
+
+    backend.window.run_frame()
+    assert root.innerHTML == (
+        '<div id="counter" style="color: red;">'
+        '<button id="inc">+</button>'
+        '<ul><li class="item-0">0</li><li class="item-1">1</li></ul>'
+        "</div>"
+    )
+
+
+def test_backend_is_looked_up_when_rendering() -> None:
+    app = _app()
+    backend = use_backend(HeadlessBackend())
+    root = backend.document.createElement("div")
+    root.id = "root"
+    backend.document.body.appendChild(root)
+
+    app.main(root="root")
+    backend.window.run_frame()
+    assert backend.document.getElementById("inc") is not None
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"batched": True}, {"delegated": True}, {"templates": True}]
+)
+def test_dispatch_and_patch(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    _app(**options).main(root="root")
+    backend.window.run_frame()
+
+    _click(backend, "inc")
+    backend.window.run_frame()
+    assert [li.textContent for li in root.iter_descendants() if _is_li(li)] == [
+        "0",
+        "1",
+        "2",
+    ]
+
+
+def _is_li(node: Any) -> bool:
+    return isinstance(node, Element) and node.localName == "li"
+
+
+def test_batched_mode_matches_direct_mode(backend: HeadlessBackend) -> None:
+    html: list[str] = []
+    for batched in [False, True]:
+        backend.document.body.childNodes.clear()
+        root = backend.document.createElement("div")
+        root.id = "root"
+        backend.document.body.appendChild(root)
+
+        app = _app(batched=batched)
+        app.main(root="root")
+        backend.window.run_frame()
+        _click(backend, "inc")
+        _click(backend, "inc")
+        backend.window.run_frame()
+        html.append(root.innerHTML)
+    assert html[0] == html[1]
+
+
+def test_delegated_mode_registers_one_listener_per_type(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    _app(delegated=True).main(root="root")
+    backend.window.run_frame()
+
+    button = backend.document.getElementById("inc")
+    assert button is not None
+    assert button.listener_count() == 0
+    assert root.listener_count("click") == 1
+
+
+@pytest.mark.parametrize("options", [{}, {"delegated": True}])
+def test_stop_propagation(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    fired: list[str] = []
+
+    def _inner(event: Any) -> Add:
+        fired.append("inner")
+        event.stopPropagation()
+        return Add(1)
+
+    def _outer(event: Any) -> Add:
+        fired.append("outer")
+        return Add(1)
+
+    AlfortDom[int, Any](
+        init=_init,
+        view=lambda _: el(
+            "div", {"onclick": _outer}, [el("button", {"id": "inc", "onclick": _inner})]
+        ),
+        update=_update,
+        **options,
+    ).main(root="root")
+    backend.window.run_frame()
+
+    _click(backend, "inc")
+    assert fired == ["inner"]
+
+
+def test_scheduler_merges_renders_within_a_frame(backend: HeadlessBackend) -> None:
+    app = _app()
+    app.main(root="root")
+    backend.window.run_frame()
+
+    for _ in range(5):
+        _click(backend, "inc")
+    assert backend.window.pending_frames == 1
+
+    backend.window.run_frame()
+    assert app.scheduler is not None
+    assert app.scheduler.stats.merged == 4
+    assert app.scheduler.stats.executed == 2
+
+
+def test_removed_subtree_releases_proxies(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _view(state: int) -> VDom:
+        items: list[VDom] = [
+            el("li", {"onclick": SetCount(i)}, [str(i)]) for i in range(state)
+        ]
+        return el("ul", {}, items)
+
+    app = AlfortDom[int, Any](init=lambda: (10, []), view=_view, update=_update)
+    app.main(root="root")
+    backend.window.run_frame()
+    live = live_proxies()
+
+    ul = root.firstChild
+    assert ul is not None and ul.firstChild is not None
+    ul.firstChild.dispatchEvent(Event("click"))
+    backend.window.run_frame()
+    assert live_proxies() == live - 10
+
+
+def test_effects_run_in_event_loop(backend: HeadlessBackend, root: Element) -> None:
+    async def _effect(dispatch: Any) -> None:
+        dispatch(SetCount(0))
+
+    def _update_with_effect(msg: Any, state: int) -> tuple[int, list[Effect[Any]]]:
+        (state, _) = _update(msg, state)
+        return (state, [_effect] if isinstance(msg, Add) else [])
+
+    async def _run() -> None:
+        AlfortDom[int, Any](init=_init, view=_view, update=_update_with_effect).main(
+            root="root"
+        )
+        backend.window.run_frame()
+        _click(backend, "inc")
+        await asyncio.sleep(0)
+        backend.window.run_frame()
+
+    asyncio.run(_run())
+    assert root.getElementById("counter") is not None
+    assert [n for n in root.iter_descendants() if _is_li(n)] == []
+
+
+@pytest.mark.parametrize("options", [{}, {"batched": True}, {"delegated": True}])
+def test_templates_clone_repeated_shapes(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    def _view(state: int) -> VDom:
+        items: list[VDom] = [
+            el(
+                "li",
+                {"class": "item", "title": f"item {i}", "onclick": SetCount(i)},
+                [el("input", {"type": "checkbox", "checked": i % 2 == 0}), str(i)],
+            )
+            for i in range(state)
+        ]
+        return el("ul", {}, items)
+
+    html: list[str] = []
+    for templates in [False, True]:
+        backend.document.body.childNodes.clear()
+        root = backend.document.createElement("div")
+        root.id = "root"
+        backend.document.body.appendChild(root)
+        backend.ffi.reset()
+
+        app = AlfortDom[int, Any](
+            init=lambda: (10, []),
+            view=_view,
+            update=_update,
+            templates=templates,
+            **options,
+        )
+        app.main(root="root")
+        backend.window.run_frame()
+        if templates:
+            # ul plus the first li rendered as is, then the li prototype
+            assert backend.ffi.calls["createElement"] == 3 + 2
+            assert backend.ffi.calls["cloneNode"] == 9
+
+        ul = root.firstChild
+        assert ul is not None
+        assert [c.firstChild.checked for c in ul.childNodes] == [  # type: ignore
+            i % 2 == 0 for i in range(10)
+        ]
+        ul.childNodes[3].dispatchEvent(Event("click"))
+        backend.window.run_frame()
+        html.append(root.innerHTML)
+    assert html[0] == html[1]
+
+
+def test_only_reflected_props_are_static() -> None:
+    assert is_static("className", "item")
+    assert is_static("title", "item 1")
+    assert is_static("style", {"color": "red"})
+    for name in ["textContent", "innerHTML", "selectedIndex", "value", "checked"]:
+        assert not is_static(name, 1)
+
+
+def test_style_is_reconciled(backend: HeadlessBackend, root: Element) -> None:
+    styles: list[dict[str, Any]] = [
+        {"color": "red", "width": "0%"},
+        {"color": "red", "width": "50%"},
+        {"width": "50%"},
+        {"width": "60%", "marginTop": "1px", "top": "0", "left": None},
+    ]
+
+    def _view(state: int) -> VDom:
+        return el("div", {"id": "bar", "style": styles[state], "onclick": Add(1)})
+
+    AlfortDom[int, Any](init=lambda: (0, []), view=_view, update=_update).main(
+        root="root"
+    )
+    backend.window.run_frame()
+    bar = backend.document.getElementById("bar")
+    assert bar is not None
+
+    calls: list[tuple[int, int]] = []
+    for _ in styles[1:]:
+        bar.dispatchEvent(Event("click"))
+        backend.ffi.reset()
+        backend.window.run_frame()
+        calls.append(
+            (backend.ffi.calls["style.set"], backend.ffi.calls["style.cssText"])
+        )
+    assert calls == [(1, 0), (1, 0), (0, 1)]
+    assert bar.getAttribute("style") == "width: 60%; margin-top: 1px; top: 0;"
+
+
+def test_property_table_probes_each_prop_once(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _view(state: int) -> VDom:
+        return el(
+            "ul",
+            {},
+            [
+                el(
+                    "li",
+                    {"class": f"row-{i}", "data-state": state, "aria-label": str(i)},
+                    [el("input", {"checked": i == state, "onclick": SetCount(i)})],
+                )
+                for i in range(10)
+            ],
+        )
+
+    properties.clear()
+    AlfortDom[int, Any](init=lambda: (0, []), view=_view, update=_update).main(
+        root="root"
+    )
+    backend.window.run_frame()
+    ul = root.firstChild
+    assert isinstance(ul, Element)
+    ul.childNodes[3].firstChild.dispatchEvent(Event("click"))  # type: ignore
+    backend.window.run_frame()
+
+    assert properties.probes == 1  # "class" on li
+    assert backend.ffi.calls["get"] == 1
+    assert [li.getAttribute("class") for li in ul.children][:2] == ["row-0", "row-1"]
+    assert [li.firstChild.checked for li in ul.childNodes].index(True) == 3  # type: ignore
+    assert ul.childNodes[0].getAttribute("data-state") == "3"  # type: ignore
+
+
+def test_changed_handlers_are_swapped_in_place(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _view(state: int) -> VDom:
+        def _on_click(_: Any) -> Add:
+            return Add(state)
+
+        return el("button", {"id": "inc", "onclick": _on_click}, [str(state)])
+
+    AlfortDom[int, Any](init=lambda: (1, []), view=_view, update=_update).main(
+        root="root"
+    )
+    backend.window.run_frame()
+    skipped = listener_stats.skipped
+
+    for _ in range(3):
+        _click(backend, "inc")
+        backend.window.run_frame()
+    assert backend.ffi.calls["addEventListener"] == 1
+    assert backend.ffi.calls["removeEventListener"] == 0
+    assert listener_stats.skipped == skipped + 2 * 3
+    assert root.textContent == "8"
+
+
+@pytest.mark.parametrize("options", [{}, {"templates": True}])
+def test_lazy_nodes_skip_unchanged_subtrees(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    rendered: list[int] = []
+
+    def _view_item(i: int, selected: bool) -> VDom:
+        rendered.append(i)
+        return el(
+            "li",
+            {"class": "selected" if selected else "", "onclick": SetCount(i)},
+            [str(i)],
+        )
+
+    def _view(state: int) -> VDom:
+        return el("ul", {}, [lazy(_view_item, i, i == state) for i in range(10)])
+
+    app = AlfortDom[int, Any](
+        init=lambda: (0, []), view=_view, update=_update, **options
+    )
+    app.main(root="root")
+    backend.window.run_frame()
+    assert rendered == list(range(10))
+
+    rendered.clear()
+    backend.ffi.reset()
+    ul = root.firstChild
+    assert isinstance(ul, Element)
+    ul.childNodes[3].dispatchEvent(Event("click"))
+    backend.window.run_frame()
+    assert rendered == [0, 3]
+    assert backend.ffi.calls["setAttribute"] == 2
+    assert [li.getAttribute("class") for li in ul.children][:4] == [
+        "",
+        "",
+        "",
+        "selected",
+    ]
+
+
+@pytest.mark.parametrize("options", [{}, {"batched": True}, {"templates": True}])
+def test_keyed_children_are_moved_not_rebuilt(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    @dataclass(frozen=True)
+    class SetRows:
+        rows: tuple[int, ...]
+
+    def _update(msg: SetRows, _: tuple[int, ...]) -> tuple[Any, list[Effect[Any]]]:
+        return (msg.rows, [])
+
+    def _view_row(row: int) -> VDom:
+        return el("li", {"key": row, "class": f"row-{row}"}, [str(row)])
+
+    def _view(rows: tuple[int, ...]) -> VDom:
+        return el(
+            "ul",
+            {"id": "list"},
+            [lazy(_view_row, r, key=r) if r % 2 else _view_row(r) for r in rows]
+            + [el("li", {"class": "footer"}, ["end"])],
+        )
+
+    profiler = Profiler()
+    app = AlfortDom[tuple[int, ...], SetRows](
+        init=lambda: (tuple(range(10)), []),
+        view=_view,
+        update=_update,
+        profiler=profiler,
+        **options,
+    )
+    dispatches: list[Any] = []
+    app._subscriber.update = lambda s, d: dispatches.append(d)  # type: ignore
+    app.main(root="root")
+    backend.window.run_frame()
+    ul = root.firstChild
+    assert ul is not None
+    assert ul.childNodes[0].getAttribute("key") is None  # type: ignore
+    before = {li.textContent: li for li in ul.childNodes}
+
+    def _render(rows: list[int]) -> Counter[str]:
+        dispatches[-1](SetRows(tuple(rows)))
+        backend.window.run_frame()
+        assert [li.textContent for li in ul.childNodes] == [
+            *map(str, rows),
+            "end",
+        ]
+        assert all(before.get(li.textContent, li) is li for li in ul.childNodes)
+        return profiler.frames[-1].patches
+
+    assert _render(list(range(1, 10))) == {"PatchRemoveChild": 1}
+    assert _render([1, 8, 3, 4, 5, 6, 7, 2, 9]) == {"PatchInsertChild": 2}
+    assert _render([9, 1, 8, 3, 4, 5, 6, 7, 2]) == {"PatchInsertChild": 1}
+    assert "PatchRemoveChild" not in _render([9, 1, 42, 8, 3, 4, 5, 6, 7, 2])
+    assert profiler.frames[-1].nodes_created == 2  # the new li and its text
+
+
+@pytest.mark.parametrize("options", [{}, {"batched": True}])
+def test_duplicate_keys_are_matched_in_order(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    renders = [[1, 1, 2], [2], [2, 1, 1, 1], [1, 2, 1], []]
+    AlfortDom[int, Any](
+        init=lambda: (0, []),
+        view=lambda state: el(
+            "ul",
+            {"id": "list", "onclick": Add(1)},
+            [el("li", {"key": r}, [str(r)]) for r in renders[state]],
+        ),
+        update=_update,
+        **options,
+    ).main(root="root")
+    for rows in renders:
+        backend.window.run_frame()
+        assert [li.textContent for li in root.iter_descendants() if _is_li(li)] == [
+            str(r) for r in rows
+        ]
+        _click(backend, "list")
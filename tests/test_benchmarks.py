@@ -0,0 +1,34 @@
+import json
+
+from benchmarks import codec, js_framework
+
+
+def test_js_framework_benchmark_smoke() -> None:
+    report = js_framework.run(repeat=1, rows=20, lots_of_rows=40)
+    results = report["results"]
+
+    assert list(results) == [
+        "create_20",
+        "create_40",
+        "replace_all",
+        "partial_update",
+        "select_row",
+        "swap_rows",
+        "remove_row",
+        "append_20",
+        "clear",
+    ]
+    assert results["create_20"]["patches"]["PatchInsertChild"] == 20 * 10
+    assert results["clear"]["patches"] == {"PatchRemoveChild": 20}
+    assert results["create_20"]["ffi_calls"] > 0
+    json.dumps(report)
+
+
+def test_codec_benchmark_smoke() -> None:
+    report = codec.run(repeat=1, rows=20, lots_of_rows=40)
+    results = report["results"]
+
+    assert results["create_20"]["ops"] > 20
+    for result in results.values():
+        assert result["binary_bytes"] < result["json_bytes"]
+    json.dumps(report)
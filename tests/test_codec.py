@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from alfort_dom.batch import (
+    OP_CREATE_ELEMENT,
+    OP_CREATE_TEXT,
+    OP_INSERT_BEFORE,
+    OP_LISTEN,
+    OP_RELEASE,
+    OP_REMOVE_ATTRIBUTE,
+    OP_REMOVE_CHILD,
+    OP_SET_ATTRIBUTE,
+    OP_SET_PROPERTY,
+    OP_SET_STYLE,
+    OP_SET_TEXT,
+)
+from alfort_dom.codec import Codec
+
+OPS = [
+    *(OP_CREATE_ELEMENT, 1, "li", None),
+    *(OP_CREATE_TEXT, 2, "héllo", None),
+    *(OP_INSERT_BEFORE, 1, 2, -1),
+    *(OP_INSERT_BEFORE, 0, 1, 300),
+    *(OP_SET_ATTRIBUTE, 1, "class", "row"),
+    *(OP_SET_PROPERTY, 1, "checked", True),
+    *(OP_SET_PROPERTY, 1, "value", None),
+    *(OP_SET_STYLE, 1, "top", 1.5),
+    *(OP_SET_ATTRIBUTE, 1, "data-n", -70000),
+    *(OP_REMOVE_ATTRIBUTE, 1, "class", None),
+    *(OP_SET_TEXT, 2, "", None),
+    *(OP_LISTEN, 0, "click", ["key", "target.value"]),
+    *(OP_REMOVE_CHILD, 0, 1, None),
+    *(OP_RELEASE, 1, None, None),
+]
+
+
+def test_patch_round_trip() -> None:
+    sender, receiver = Codec(), Codec()
+    first = sender.encode_patch(OPS)
+    assert receiver.decode(memoryview(first)) == ["patch", OPS]
+
+    # names crossed with the first message, so only their indices are sent
+    second = sender.encode_patch(OPS)
+    assert len(second) < len(first)
+    assert b"class" not in second and b"target.value" not in second
+    assert receiver.decode(bytes(second)) == ["patch", OPS]
+    assert len(second) < len(json.dumps(["patch", OPS])) / 2
+
+
+def test_event_round_trip() -> None:
+    sender, receiver = Codec(), Codec()
+    values = ["Enter", None, 3, 2.5, True, ["nested"]]
+    for _ in range(2):
+        data = sender.encode_event("keydown", [12, 4000], values)
+        assert receiver.decode(data) == ["event", "keydown", [12, 4000], values]
+
+
+def test_unsupported_values_are_rejected() -> None:
+    with pytest.raises(TypeError):
+        Codec().encode_patch([OP_SET_PROPERTY, 1, "value", object()])
+    with pytest.raises(ValueError):
+        Codec().decode(b"\x09")
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import AlfortDom, decode
+from alfort_dom.event import on_keydown
+from alfort_dom.headless import Element, Event, HeadlessBackend
+
+
+@dataclass(frozen=True)
+class SetText:
+    text: str
+    key: str | None = None
+
+
+def _update(msg: SetText, state: str) -> tuple[str, list[Effect[SetText]]]:
+    return (f"{msg.text}:{msg.key}", [])
+
+
+def _view(state: str) -> VDom:
+    return el(
+        "div",
+        {},
+        [
+            el(
+                "input",
+                {
+                    "id": "input",
+                    "oninput": decode(SetText, text="target.value", key="detail.key"),
+                },
+            ),
+            state,
+        ],
+    )
+
+
+def test_decoder_extracts_fields_in_one_call(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    AlfortDom[str, SetText](init=lambda: ("", []), view=_view, update=_update).main(
+        root="root"
+    )
+    backend.window.run_frame()
+    input = backend.document.getElementById("input")
+    assert input is not None
+
+    input.value = "hello"
+    backend.ffi.reset()
+    input.dispatchEvent(Event("input"))
+    assert backend.ffi.calls["extract"] == 1
+
+    backend.window.run_frame()
+    assert root.textContent == "hello:None"
+
+
+def test_decoder_with_event_subscription(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _on_key(key: str | None) -> SetText:
+        return SetText("key", key)
+
+    def _subscriptions(state: str) -> list[Any]:
+        return [on_keydown(decode(_on_key, key="key"))]
+
+    AlfortDom[str, SetText](
+        init=lambda: ("", []),
+        view=_view,
+        update=_update,
+        subscriptions=_subscriptions,
+    ).main(root="root")
+    backend.document.dispatchEvent(Event("keydown", key="Enter"))
+    backend.window.run_frame()
+    assert root.textContent == "key:Enter"
+
+
+def test_decoder_equality_and_validation() -> None:
+    assert decode(SetText, text="target.value") == decode(SetText, text="target.value")
+    assert decode(SetText, text="target.value") != decode(SetText, text="key")
+    with pytest.raises(ValueError):
+        decode(SetText, text="target.value); alert(1")
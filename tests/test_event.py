@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import pytest
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import AlfortDom
+from alfort_dom.event import (
+    Handler,
+    Limiter,
+    debounce,
+    listener_count,
+    on,
+    on_animation_frame,
+    on_click,
+    on_mousemove,
+    on_resize,
+    on_scroll,
+    on_visibility_change,
+    sample_frame,
+    throttle,
+)
+from alfort_dom.headless import Element, Event, HeadlessBackend
+
+
+@dataclass(frozen=True)
+class Move:
+    x: int
+
+
+def _update(msg: Move, state: list[int]) -> tuple[list[int], list[Effect[Move]]]:
+    return (state + [msg.x], [])
+
+
+def _run(
+    backend: HeadlessBackend,
+    limit: Callable[[Handler[Move]], Limiter[Move]],
+    **kwargs: Any,
+) -> list[list[int]]:
+    states: list[list[int]] = []
+
+    def _view(state: list[int]) -> VDom:
+        return el("div", {"id": "area", "onmousemove": limit(lambda e: Move(e.x))})
+
+    def _record(msg: Move, state: list[int]) -> tuple[list[int], list[Effect[Move]]]:
+        (new_state, effects) = _update(msg, state)
+        states.append(new_state)
+        return (new_state, effects)
+
+    AlfortDom[list[int], Move](
+        init=lambda: ([], []), view=_view, update=_record, **kwargs
+    ).main(root="root")
+    backend.window.run_frame()
+    area = backend.document.getElementById("area")
+    assert area is not None
+
+    # ten events 4ms apart, re-rendering after each one
+    for x in range(10):
+        area.dispatchEvent(Event("mousemove", x=x))
+        backend.window.run_frame(4)
+    backend.window.run_frame(100)
+    return states
+
+
+@pytest.mark.parametrize("options", [{}, {"delegated": True}])
+def test_throttle(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    states = _run(backend, lambda h: throttle(10, h), **options)
+    assert states[-1] == [0, 2, 4, 7, 9]
+
+
+def test_throttle_without_trailing(backend: HeadlessBackend, root: Element) -> None:
+    states = _run(backend, lambda h: throttle(10, h, trailing=False))
+    assert states[-1] == [0, 3, 6, 9]
+
+
+def test_debounce(backend: HeadlessBackend, root: Element) -> None:
+    states = _run(backend, lambda h: debounce(10, h))
+    assert states[-1] == [9]
+
+
+def test_sample_frame(backend: HeadlessBackend, root: Element) -> None:
+    (x, calls) = (0, 0)
+
+    def _handler(e: Any) -> Move:
+        nonlocal calls
+        calls += 1
+        return Move(e.x)
+
+    def _subscriptions(state: list[int]) -> list[Any]:
+        return [on_mousemove(sample_frame(_handler))]
+
+    AlfortDom[list[int], Move](
+        init=lambda: ([], []),
+        view=lambda _: el("div"),
+        update=_update,
+        subscriptions=_subscriptions,
+    ).main(root="root")
+    for _ in range(3):
+        for _ in range(5):
+            backend.document.dispatchEvent(Event("mousemove", x=x))
+            x += 1
+        backend.window.run_frame()
+    assert calls == 3
+
+
+def test_subscriptions_share_one_native_listener(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _subscriptions(state: list[int]) -> list[Any]:
+        subscriptions = [on_click(lambda e: Move(1))]
+        if len(state) < 2:
+            subscriptions.append(on_click(lambda e: Move(2)))
+        subscriptions.append(on("resize", lambda e: Move(3), target="window"))
+        return subscriptions
+
+    app = AlfortDom[list[int], Move](
+        init=lambda: ([], []),
+        view=lambda state: el("div", {}, [",".join(map(str, state))]),
+        update=_update,
+        subscriptions=_subscriptions,
+    )
+    app.main(root="root")
+    assert listener_count("document") == 1
+    assert listener_count("window") == 1
+    assert backend.document.listener_count("click") == 1
+
+    backend.document.dispatchEvent(Event("click"))
+    backend.document.dispatchEvent(Event("click"))
+    backend.window.dispatchEvent(Event("resize"))
+    backend.window.run_frame()
+    assert root.textContent == "1,2,1,3"
+    assert backend.document.listener_count("click") == 1
+
+
+def test_window_subscriptions(backend: HeadlessBackend, root: Element) -> None:
+    def _on_frame(timestamp: float) -> Move:
+        return Move(-1)
+
+    def _subscriptions(state: list[int]) -> list[Any]:
+        return [
+            on_resize(lambda e: Move(e.target.innerWidth)),
+            on_scroll(lambda e: Move(int(e.target.scrollY))),
+            on_visibility_change(lambda e: Move(int(e.target.hidden))),
+            on_animation_frame(_on_frame),
+        ]
+
+    states: list[list[int]] = [[]]
+
+    def _record(msg: Move, state: list[int]) -> tuple[list[int], list[Effect[Move]]]:
+        states.append(state + [msg.x])
+        return (states[-1], [])
+
+    AlfortDom[list[int], Move](
+        init=lambda: ([], []),
+        view=lambda _: el("div"),
+        update=_record,
+        subscriptions=_subscriptions,
+    ).main(root="root")
+    assert backend.window.passive_count("scroll") == 1
+    assert backend.window.passive_count("resize") == 0
+
+    for y in range(3):
+        backend.window.innerWidth = 800 + y
+        backend.window.dispatchEvent(Event("resize"))
+        backend.window.scrollY = y
+        backend.window.dispatchEvent(Event("scroll"))
+    backend.window.run_frame()
+    assert sorted(states[-1]) == [-1, 2, 802]
+
+    backend.document.visibilityState = "hidden"
+    backend.document.dispatchEvent(Event("visibilitychange"))
+    backend.window.run_frame()
+    backend.window.run_frame()
+    assert states[-1][-1] == 1
+    assert backend.window.pending_frames == 0
+
+    backend.document.visibilityState = "visible"
+    backend.document.dispatchEvent(Event("visibilitychange"))
+    backend.window.run_frame()
+    assert states[-1][-2:] == [0, -1]
+
+
+def test_animation_frame_unsubscribing_itself(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _on_frame(timestamp: float) -> Move:
+        return Move(1)
+
+    def _subscriptions(state: list[int]) -> list[Any]:
+        return [on_animation_frame(_on_frame)] if len(state) < 3 else []
+
+    AlfortDom[list[int], Move](
+        init=lambda: ([], []),
+        view=lambda state: el("div", {}, [str(len(state))]),
+        update=_update,
+        subscriptions=_subscriptions,
+    ).main(root="root")
+
+    for _ in range(5):
+        backend.window.run_frame()
+    assert root.textContent == "3"
+    assert backend.window.pending_frames == 0
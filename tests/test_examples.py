@@ -0,0 +1,86 @@
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+from types import ModuleType
+
+from alfort_dom import local_storage
+from alfort_dom.headless import Element, Event, HeadlessBackend
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "docs" / "examples"
+
+
+def _load_example(name: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(
+        f"example_{name}", EXAMPLES_DIR / name / "main.py"
+    )
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _find(root: Element, tag: str, class_: str | None = None) -> list[Element]:
+    return [
+        n
+        for n in root.iter_descendants()
+        if isinstance(n, Element)
+        and n.localName == tag
+        and (class_ is None or class_ in n.className.split())
+    ]
+
+
+def test_todomvc(backend: HeadlessBackend, root: Element) -> None:
+    async def _run() -> None:
+        _load_example("todomvc")
+        backend.window.run_frame()
+
+        (new_todo,) = _find(root, "input", "new-todo")
+        for task in ["buy milk", "walk the dog"]:
+            new_todo.value = task
+            new_todo.dispatchEvent(Event("input"))
+            new_todo.dispatchEvent(Event("keydown", key="Enter"))
+            await asyncio.sleep(0)
+        backend.window.run_frame()
+
+        assert [e.textContent for e in _find(root, "label")][1:] == [
+            "buy milk",
+            "walk the dog",
+        ]
+        (toggle, _) = _find(root, "input", "toggle")
+        toggle.dispatchEvent(Event("click"))
+        await asyncio.sleep(0)
+        backend.window.run_frame()
+
+        assert len(_find(root, "li", "completed")) == 1
+        assert backend.local_storage.getItem("todos-alfort") is None
+        backend.window.dispatchEvent(Event("pagehide"))
+        saved = [
+            json.loads(backend.local_storage.getItem(f"todos-alfort.entries.{i}") or "")
+            for i in json.loads(
+                backend.local_storage.getItem("todos-alfort.entries") or ""
+            )
+        ]
+        assert [e["completed"] for e in saved] == [True, False]
+
+    try:
+        asyncio.run(_run())
+    finally:
+        local_storage.disable_cache()
+
+
+def test_todomvc_loads_a_model_saved_whole(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    entry = {"id": 0, "description": "buy milk", "completed": True, "editing": False}
+    backend.local_storage.setItem(
+        "todos-alfort",
+        json.dumps({"entries": [entry], "field": "", "uid": 1, "visibility": "all"}),
+    )
+    try:
+        _load_example("todomvc")
+        backend.window.run_frame()
+        assert [e.textContent for e in _find(root, "label")][1:] == ["buy milk"]
+        assert len(_find(root, "li", "completed")) == 1
+    finally:
+        local_storage.disable_cache()
@@ -0,0 +1,112 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+
+from alfort import Effect
+from alfort.vdom import el
+
+from alfort_dom import AlfortDom
+from alfort_dom.headless import Element, Event, HeadlessBackend
+from alfort_dom.indexed_db import (
+    MemoryStore,
+    StorageError,
+    load,
+    open_store,
+    remove,
+    save,
+)
+
+
+def test_memory_store() -> None:
+    async def _run() -> None:
+        store = MemoryStore()
+        entries = [1, 2]
+        await store.put("b", {"entries": entries, "blob": b"\x00\x01"})
+        await store.put("a", 1)
+        entries.append(3)
+
+        assert await store.get("b") == {"entries": [1, 2], "blob": b"\x00\x01"}
+        assert await store.keys() == ["a", "b"]
+        await store.delete("a")
+        assert await store.get("a") is None
+        assert [k for k, _ in await store.items()] == ["b"]
+
+    asyncio.run(_run())
+
+
+@dataclass(frozen=True)
+class Loaded:
+    value: Any
+
+
+@dataclass(frozen=True)
+class Add:
+    ...
+
+
+def test_save_and_load_effects(backend: HeadlessBackend, root: Element) -> None:
+    def _init() -> tuple[list[int], list[Effect[Any]]]:
+        return ([], [load(open_store(), "model", Loaded)])
+
+    def _update(msg: Any, state: list[int]) -> tuple[list[int], list[Effect[Any]]]:
+        match msg:
+            case Loaded(value):
+                return (value or [], [])
+            case Add():
+                state = state + [len(state)]
+                return (state, [save(open_store(), "model", state)])
+            case _:
+                return (state, [])
+
+    async def _run() -> Any:
+        await open_store().put("model", [0])
+        app = AlfortDom[list[int], Any](
+            init=_init,
+            view=lambda state: el("p", {"onclick": Add()}, [str(state)]),
+            update=_update,
+        )
+        app.main(root="root")
+        await _settle()
+        backend.window.run_frame()
+        assert root.textContent == "[0]"
+
+        assert root.firstChild is not None
+        root.firstChild.dispatchEvent(Event("click"))
+        root.firstChild.dispatchEvent(Event("click"))
+        await _settle()
+        return await open_store().get("model")
+
+    assert asyncio.run(_run()) == [0, 1, 2]
+
+
+class _FailingStore(MemoryStore):
+    async def put(self, key: str, value: Any) -> None:
+        raise StorageError("quota exceeded")
+
+    async def get(self, key: str) -> Any | None:
+        raise StorageError("quota exceeded")
+
+    async def delete(self, key: str) -> None:
+        raise StorageError("quota exceeded")
+
+
+def test_effects_route_errors_to_on_error() -> None:
+    msgs: list[Any] = []
+    store = _FailingStore()
+
+    def _on_error(e: Exception) -> str:
+        return str(e)
+
+    async def _run() -> None:
+        await save(store, "k", 1, on_error=_on_error)(msgs.append)
+        await load(store, "k", Loaded, on_error=_on_error)(msgs.append)
+        await remove(store, "k", on_error=_on_error)(msgs.append)
+
+    asyncio.run(_run())
+    assert msgs == ["quota exceeded"] * 3
+
+
+async def _settle() -> None:
+    # let the effect tasks and the store operations they await run
+    for _ in range(3):
+        await asyncio.sleep(0)
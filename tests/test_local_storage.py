@@ -0,0 +1,79 @@
+from alfort_dom.headless import Event, HeadlessBackend
+from alfort_dom.local_storage import LocalStorage
+
+
+def test_uncached_writes_go_straight_to_storage(backend: HeadlessBackend) -> None:
+    storage = LocalStorage()
+    storage["a"] = "1"
+    assert backend.local_storage.getItem("a") == "1"
+    assert storage["a"] == "1"
+    del storage["a"]
+    assert "a" not in storage
+    assert storage.stats.flushes == 2
+
+
+def test_cached_writes_are_batched(backend: HeadlessBackend) -> None:
+    backend.local_storage.setItem("kept", "x")
+    storage = LocalStorage()
+    storage.enable_cache(flush_ms=100)
+
+    backend.ffi.reset()
+    for i in range(50):
+        storage["model"] = str(i)
+        storage["model"]
+    storage["kept"] = "x"
+    assert list(storage) == ["kept", "model"]
+    assert len(storage) == 2 and "model" in storage
+    assert backend.ffi.calls["storage.setItem"] == 0
+    assert backend.local_storage.getItem("model") is None
+
+    backend.window.advance(100)
+    assert backend.local_storage.getItem("model") == "49"
+    assert backend.ffi.calls["storage.setItem"] == 1
+    assert storage.stats.flushes == 1
+    assert storage.stats.bytes_written == 2 * len("model49")
+
+    del storage["kept"]
+    backend.window.dispatchEvent(Event("pagehide"))
+    assert backend.local_storage.getItem("kept") is None
+    assert storage.stats.flushes == 2
+
+    storage.disable_cache()
+    storage["model"] = "direct"
+    assert backend.local_storage.getItem("model") == "direct"
+
+
+def test_key_index_follows_other_tabs(backend: HeadlessBackend) -> None:
+    backend.local_storage.setItem("0_commands", "internal")
+    backend.local_storage.setItem("a", "1")
+    storage = LocalStorage()
+    assert len(storage) == len(list(storage)) == 1
+
+    backend.ffi.reset()
+    storage["b"] = "2"
+    assert list(storage) == ["a", "b"] and "b" in storage and len(storage) == 2
+    assert backend.ffi.calls["storage.object_keys"] == 0
+
+    backend.local_storage.setItem("c", "3")
+    backend.window.dispatchEvent(Event("storage", key="c", newValue="3"))
+    backend.local_storage.removeItem("a")
+    backend.window.dispatchEvent(Event("storage", key="a", newValue=None))
+    assert list(storage) == ["b", "c"]
+
+    backend.local_storage.clear()
+    backend.window.dispatchEvent(Event("storage", key=None, newValue=None))
+    assert len(storage) == 0
+
+
+def test_bulk_items_and_update(backend: HeadlessBackend) -> None:
+    storage = LocalStorage()
+    backend.ffi.reset()
+    storage.update({f"k{i}": str(i) for i in range(10)}, extra="x")
+    assert backend.ffi.calls["storage.write"] == 1
+    assert backend.ffi.calls["storage.setItem"] == 0
+    assert storage.stats.writes == 11
+
+    items = dict(storage.items())
+    assert items["k9"] == "9" and items["extra"] == "x" and len(items) == 11
+    assert backend.ffi.calls["storage.snapshot"] == 1
+    assert backend.ffi.calls["storage.getItem"] == 0
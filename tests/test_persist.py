@@ -0,0 +1,86 @@
+import json
+from dataclasses import asdict, dataclass, replace
+
+from alfort_dom.persist import Persister
+
+
+@dataclass(frozen=True)
+class Entry:
+    id: int
+    description: str
+
+
+@dataclass(frozen=True)
+class Model:
+    entries: list[Entry]
+    field: str
+
+
+def _persister(storage: dict[str, str]) -> Persister[Model]:
+    return Persister(Model, storage, "todos", keys={"entries": lambda e: e.id})
+
+
+def test_save_writes_only_changed_slices() -> None:
+    storage: dict[str, str] = {}
+    persister = _persister(storage)
+    model = Model([Entry(i, f"task {i}") for i in range(100)], "")
+    persister.save(model)
+    assert persister.stats.writes == 1 + 100 + 1 + 1
+
+    persister.stats.writes = 0
+    model = replace(model, field="typing")
+    persister.save(model)
+    assert persister.stats.writes == 1
+
+    persister.stats.writes = 0
+    entries = model.entries[:]
+    entries[5] = replace(entries[5], description="done")
+    del entries[7]
+    model = replace(model, entries=entries)
+    persister.save(model)
+    assert persister.stats.writes == 2  # the entry and the index
+    assert persister.stats.deletes == 1
+    assert "todos.entries.7" not in storage
+
+
+def test_load_rebuilds_the_model() -> None:
+    storage: dict[str, str] = {}
+    model = Model([Entry(i, f"task {i}") for i in range(3)], "x")
+    _persister(storage).save(model)
+
+    persister = _persister(storage)
+    loaded = persister.load()
+    assert loaded is not None
+    assert type(loaded.entries) is list
+    assert loaded == model
+
+    entries = loaded.entries + [Entry(3, "new")]
+    persister.save(replace(loaded, entries=entries))
+    assert persister.stats.writes == 2  # the new entry and the index
+    assert json.loads(storage["todos.entries"]) == ["0", "1", "2", "3"]
+    assert json.loads(storage["todos.entries.3"]) == {"id": 3, "description": "new"}
+    assert _persister(storage).load() == replace(model, entries=entries)
+
+    entries = entries[1:]
+    entries[0] = replace(entries[0], description="done")
+    persister.stats.writes = 0
+    persister.save(replace(loaded, entries=entries))
+    assert persister.stats.writes == 2
+    assert persister.stats.deletes == 1
+    assert _persister(storage).load() == replace(model, entries=entries)
+
+
+def test_load_migrates_a_model_saved_whole() -> None:
+    model = Model([Entry(i, f"task {i}") for i in range(3)], "x")
+    storage = {"todos": json.dumps(asdict(model))}
+    persister = _persister(storage)
+    assert persister.load() == model
+
+    persister.save(model)
+    assert json.loads(storage["todos"]) == ["entries", "field"]
+    assert json.loads(storage["todos.entries"]) == ["0", "1", "2"]
+    assert _persister(storage).load() == model
+
+
+def test_load_without_saved_model() -> None:
+    assert _persister({}).load() is None
@@ -0,0 +1,51 @@
+from typing import Any
+
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import AlfortDom
+from alfort_dom.headless import Element, Event, HeadlessBackend
+from alfort_dom.profile import FrameProfile, Profiler
+
+
+def _view(state: int) -> VDom:
+    return el(
+        "ul",
+        {"onclick": "shrink"},
+        [el("li", {}, [str(i)]) for i in range(state)],
+    )
+
+
+def _update(msg: Any, state: int) -> tuple[int, list[Effect[Any]]]:
+    return (state - 1, [])
+
+
+def test_profiler_records_frames(backend: HeadlessBackend, root: Element) -> None:
+    received: list[FrameProfile] = []
+    profiler = Profiler(capacity=2, on_frame=received.append)
+    AlfortDom[int, Any](
+        init=lambda: (3, []), view=_view, update=_update, profiler=profiler
+    ).main(root="root")
+    backend.window.run_frame()
+
+    (first,) = received
+    assert first.messages == 0
+    assert first.nodes_created == 7
+    assert first.patches["PatchInsertChild"] == 7
+
+    ul = root.firstChild
+    assert ul is not None
+    for _ in range(2):
+        ul.dispatchEvent(Event("click"))
+    backend.window.run_frame()
+
+    second = received[-1]
+    assert second.messages == 2
+    assert second.nodes_removed == 4
+    assert second.patches == {"PatchRemoveChild": 2}
+    assert second.total_ms >= second.patch_ms
+
+    ul.dispatchEvent(Event("click"))
+    backend.window.run_frame()
+    assert [f.frame for f in profiler.frames] == [1, 2]
+    assert profiler.summary()["frames"] == 2
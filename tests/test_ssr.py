@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import AlfortDom, lazy
+from alfort_dom.headless import Element, Event, HeadlessBackend
+from alfort_dom.ssr import render_to_string
+
+
+@dataclass(frozen=True)
+class Add:
+    value: int
+
+
+def _init() -> tuple[int, list[Effect[Add]]]:
+    return (1, [])
+
+
+def _update(msg: Add, state: int) -> tuple[int, list[Effect[Add]]]:
+    return (state + msg.value, [])
+
+
+def _view(state: int) -> VDom:
+    return el(
+        "div",
+        {"id": "counter", "style": {"fontSize": "12px"}},
+        [
+            el("button", {"id": "inc", "onclick": Add(1)}, ["+"]),
+            el("input", {"value": state, "disabled": False, "autofocus": True}),
+            "count: ",
+            str(state),
+        ],
+    )
+
+
+def _app(**kwargs: Any) -> AlfortDom[int, Add]:
+    return AlfortDom[int, Add](init=_init, view=_view, update=_update, **kwargs)
+
+
+def test_render_to_string() -> None:
+    assert render_to_string(el("p", {"title": '"<&>"'}, ["a < b", "c"])) == (
+        '<p title="&quot;&lt;&amp;&gt;&quot;">a &lt; b<!-- -->c</p>'
+    )
+    assert render_to_string(el("p", {}, [lazy(str.upper, "a"), "b"])) == (
+        "<p>A<!-- -->b</p>"
+    )
+    assert _app().render_to_string() == (
+        '<div id="counter" style="font-size: 12px;">'
+        '<button id="inc">+</button><input value="1" autofocus>'
+        "count: <!-- -->1</div>"
+    )
+
+
+@pytest.mark.parametrize("options", [{}, {"batched": True}, {"delegated": True}])
+def test_hydrate_adopts_server_markup(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    root.innerHTML = _app().render_to_string()
+    button = backend.document.getElementById("inc")
+    assert button is not None
+
+    backend.ffi.reset()
+    _app(**options).hydrate(root="root")
+    assert backend.ffi.calls["createElement"] == 0
+    assert backend.ffi.calls["createTextNode"] == 0
+
+    button.dispatchEvent(Event("click"))
+    backend.window.run_frame()
+    assert backend.document.getElementById("inc") is button
+    assert root.textContent == "+count: 2"
+
+
+def test_hydrate_rebuilds_mismatched_markup(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    root.innerHTML = '\n<div id="counter"><span>stale</span></div>\n'
+    _app().hydrate(root="root")
+    assert root.innerHTML.strip() == (
+        '<div id="counter" style="font-size: 12px;"><button id="inc">+</button>'
+        '<input autofocus="">count: 1</div>'
+    )
+
+    _click(backend)
+    backend.window.run_frame()
+    assert root.textContent.strip() == "+count: 2"
+
+
+def test_hydrate_markup_rendered_from_another_state(
+    backend: HeadlessBackend, root: Element
+) -> None:
+    def _view(state: int) -> VDom:
+        if state == 1:
+            props = {"className": "s1", "style": {"color": "red"}, "title": "first"}
+        else:
+            props = {"className": "s2", "style": {"fontSize": "2px"}}
+        return el("p", props, [str(state)])
+
+    def _app(state: int) -> AlfortDom[int, Add]:
+        return AlfortDom[int, Add](init=lambda: (state, []), view=_view, update=_update)
+
+    markup = _app(1).render_to_string()
+    assert markup == '<p class="s1" style="color: red;" title="first">1</p>'
+    root.innerHTML = markup
+    _app(2).hydrate(root="root")
+    backend.window.run_frame()
+    assert root.innerHTML == '<p class="s2" style="font-size: 2px;">2</p>'
+
+
+def test_render_attribute_names() -> None:
+    assert (
+        render_to_string(
+            el(
+                "label",
+                {"className": "a", "htmlFor": "b", "tabIndex": 1, "selectedIndex": 0},
+                [],
+            )
+        )
+        == '<label class="a" for="b" tabindex="1"></label>'
+    )
+    assert render_to_string(el("p", {"textContent": "a < b"}, [])) == (
+        "<p>a &lt; b</p>"
+    )
+    assert render_to_string(el("p", {"innerHTML": "<b>a</b>"}, [])) == (
+        "<p><b>a</b></p>"
+    )
+
+
+def _click(backend: HeadlessBackend) -> None:
+    button = backend.document.getElementById("inc")
+    assert button is not None
+    button.dispatchEvent(Event("click"))
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import AlfortDom
+from alfort_dom.headless import Element, Event, HeadlessBackend
+from alfort_dom.proxy import live_proxies
+from alfort_dom.virtual import slot_count, virtual_list, visible_range
+
+ROWS = 50_000
+
+
+@dataclass(frozen=True)
+class Scrolled:
+    scroll_top: float
+
+
+def _update(msg: Scrolled, _: float) -> tuple[float, list[Effect[Scrolled]]]:
+    return (msg.scroll_top, [])
+
+
+def _view(scroll_top: float) -> VDom:
+    return virtual_list(
+        count=ROWS,
+        row_height=20,
+        height=400,
+        scroll_top=scroll_top,
+        view_row=lambda i: el("span", {}, [f"row {i}"]),
+        on_scroll=Scrolled,
+        props={"id": "list"},
+    )
+
+
+def test_visible_range() -> None:
+    assert visible_range(100, 20, 400, 0, overscan=5) == range(0, 25)
+    assert visible_range(100, 20, 400, 1010, overscan=5) == range(45, 76)
+    assert visible_range(100, 20, 400, 5000, overscan=5) == range(245, 100)
+    assert slot_count(20, 400, overscan=5) == 31
+
+
+@pytest.mark.parametrize("options", [{}, {"delegated": True}])
+def test_virtual_list_recycles_rows(
+    backend: HeadlessBackend, root: Element, options: dict[str, Any]
+) -> None:
+    app = AlfortDom[float, Scrolled](
+        init=lambda: (0.0, []), view=_view, update=_update, **options
+    )
+    app.main(root="root")
+    backend.window.run_frame()
+    container = backend.document.getElementById("list")
+    assert container is not None
+    spacer = container.firstChild
+    assert isinstance(spacer, Element)
+
+    def _rows() -> list[str]:
+        return sorted(
+            (int(s.textContent.split()[1]) for s in spacer.childNodes)  # type: ignore
+        )
+
+    assert _rows() == list(range(25))
+    assert spacer.style.height == f"{ROWS * 20}px"
+    created = backend.ffi.calls["createElement"]
+    proxies = live_proxies()
+
+    for scroll_top in [1000, 1040, 250_000, 999_000]:
+        container.scrollTop = scroll_top
+        for _ in range(3):
+            container.dispatchEvent(Event("scroll", bubbles=False))
+        backend.window.run_frame()  # delivers the sampled scroll
+        backend.window.run_frame()  # renders
+        assert _rows() == list(visible_range(ROWS, 20, 400, scroll_top))
+        assert _rows()[0] == scroll_top // 20 - 5
+
+    # only the slots filled after the first scroll were created, a wrapper and
+    # a span each, then the rows were drawn into the same nodes
+    assert backend.ffi.calls["createElement"] == created + 2 * (30 - 25)
+    assert live_proxies() == proxies
+    assert len(spacer.childNodes) <= slot_count(20, 400)
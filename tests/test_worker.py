@@ -0,0 +1,133 @@
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from alfort import Effect
+from alfort.vdom import VDom, el
+
+from alfort_dom import decode
+from alfort_dom.headless import Element, Event, HeadlessBackend
+from alfort_dom.worker import PatchApplier, WorkerApp
+
+
+@dataclass(frozen=True)
+class SetText:
+    text: str
+
+
+@dataclass(frozen=True)
+class Remove:
+    index: int
+
+
+def _update(msg: Any, state: list[str]) -> tuple[list[str], list[Effect[Any]]]:
+    match msg:
+        case SetText(text):
+            return ([*state, text], [])
+        case Remove(index):
+            return ([s for i, s in enumerate(state) if i != index], [])
+        case _:
+            return (state, [])
+
+
+def _view(state: list[str]) -> VDom:
+    return el(
+        "div",
+        {},
+        [
+            el(
+                "input",
+                {"id": "text", "onchange": decode(SetText, text="target.value")},
+            ),
+            el(
+                "ul",
+                {"class": "items"},
+                [
+                    el("li", {"key": s, "onclick": Remove(i)}, [s])
+                    for i, s in enumerate(state)
+                ],
+            ),
+        ],
+    )
+
+
+class Channel:
+    """Two queues standing in for postMessage, serializing every message."""
+
+    def __init__(self) -> None:
+        self.to_main: deque[Any] = deque()
+        self.to_worker: deque[Any] = deque()
+        self.sent: list[Any] = []
+
+    def post_to_main(self, message: Any) -> None:
+        self._send(self.to_main, message)
+
+    def post_to_worker(self, message: Any) -> None:
+        self._send(self.to_worker, message)
+
+    def _send(self, queue: deque[Any], message: Any) -> None:
+        if isinstance(message, bytearray):
+            # transferred as an ArrayBuffer, received as its memoryview
+            self.sent.append(message)
+            queue.append(memoryview(bytes(message)))
+            return
+        data = json.dumps(message)
+        self.sent.append(data)
+        queue.append(json.loads(data))
+
+    def pump(self, worker: WorkerApp[Any, Any], applier: PatchApplier) -> None:
+        while self.to_main or self.to_worker:
+            while self.to_worker:
+                worker.on_message(self.to_worker.popleft())
+            while self.to_main:
+                applier.on_message(self.to_main.popleft())
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_worker_app_renders_through_patch_stream(
+    backend: HeadlessBackend, root: Element, binary: bool
+) -> None:
+    channel = Channel()
+    worker = WorkerApp[list[str], Any](
+        init=lambda: (["a", "b"], []),
+        view=_view,
+        update=_update,
+        post=channel.post_to_main,
+        binary=binary,
+    )
+    applier = PatchApplier("root", post=channel.post_to_worker, binary=binary)
+    worker.main()
+
+    def _frame() -> None:
+        backend.window.run_frame()
+        channel.pump(worker, applier)
+        backend.window.run_frame()
+        channel.pump(worker, applier)
+
+    _frame()
+    assert len(channel.sent) == 1
+    assert root.innerHTML.count("<li") == 2
+    ul = root.firstChild.childNodes[1]  # type: ignore
+
+    text = backend.document.getElementById("text")
+    assert text is not None
+    text.value = "c"  # type: ignore
+    backend.ffi.reset()
+    text.dispatchEvent(Event("change"))
+    _frame()
+    assert [li.textContent for li in ul.childNodes] == ["a", "b", "c"]
+    # the payload is read on the main thread, then by the decoder from the
+    # stand-in event in the worker, and the patch is applied by one call
+    assert backend.ffi.calls["extract"] == 2
+    assert backend.ffi.calls["patch_interpreter"] == 1
+
+    nodes = len(applier.nodes)
+    ul.childNodes[0].dispatchEvent(Event("click"))
+    _frame()
+    assert [li.textContent for li in ul.childNodes] == ["b", "c"]
+    assert len(applier.nodes) == nodes - 2  # the li and its text were released
+
+    applier.close()
+    assert root.listener_count() == 0